@@ -6,745 +6,181 @@ AI桌面助手 - 基于Ollama的本地AI对话助手
 """
 
 import json
+import base64
 import subprocess
 import sys
 import os
 import re
 import shutil
+import time
+import platform
+import threading
+import stat
+import functools
+import types
+import ctypes
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
 from typing import List, Dict, Optional
 import requests
+from requests.adapters import HTTPAdapter
 from datetime import datetime
 
-class OllamaClient:
-    """Ollama客户端，用于与本地Ollama服务通信"""
-    
-    def __init__(self, base_url: str = "http://localhost:11434"):
-        self.base_url = base_url
-        
-    def list_models(self) -> List[Dict]:
-        """获取已安装的模型列表"""
-        try:
-            response = requests.get(f"{self.base_url}/api/tags")
-            if response.status_code == 200:
-                return response.json().get('models', [])
-            else:
-                return []
-        except Exception as e:
-            print(f"获取模型列表失败: {e}")
-            return []
-    
-    def chat(self, model: str, messages: List[Dict], system_prompt: str = "") -> str:
-        """与指定模型进行对话（支持多轮对话）"""
-        try:
-            # 构建消息列表
-            chat_messages = []
-            if system_prompt:
-                chat_messages.append({"role": "system", "content": system_prompt})
-            chat_messages.extend(messages)
-            
-            payload = {
-                "model": model,
-                "messages": chat_messages,
-                "stream": False
-            }
-            
-            response = requests.post(f"{self.base_url}/api/chat", json=payload)
-            if response.status_code == 200:
-                return response.json()['message']['content']
-            else:
-                return f"请求失败: {response.status_code}"
-        except Exception as e:
-            return f"对话失败: {e}"
-    
-    def chat_stream(self, model: str, messages: List[Dict], system_prompt: str = ""):
-        """与指定模型进行流式对话（支持多轮对话）"""
-        try:
-            # 构建消息列表
-            chat_messages = []
-            if system_prompt:
-                chat_messages.append({"role": "system", "content": system_prompt})
-            chat_messages.extend(messages)
-            
-            payload = {
-                "model": model,
-                "messages": chat_messages,
-                "stream": True
-            }
-            
-            response = requests.post(f"{self.base_url}/api/chat", json=payload, stream=True)
-            if response.status_code == 200:
-                full_response = ""
-                for line in response.iter_lines():
-                    if line:
-                        try:
-                            data = json.loads(line.decode('utf-8'))
-                            if 'message' in data and 'content' in data['message']:
-                                content = data['message']['content']
-                                full_response += content
-                                yield content
-                            if data.get('done', False):
-                                break
-                        except json.JSONDecodeError:
-                            continue
-                return full_response
-            else:
-                yield f"请求失败: {response.status_code}"
-                return f"请求失败: {response.status_code}"
-        except Exception as e:
-            yield f"对话失败: {e}"
-            return f"对话失败: {e}"
-
-class TaskExecutor:
-    """任务执行器，用于执行AI识别出的特定任务"""
-    
-    @staticmethod
-    def get_all_shortcuts() -> Dict[str, str]:
-        """获取所有可用的快捷方式和文件夹"""
-        shortcuts = {}
-        if sys.platform == "win32":
-            # 获取用户桌面路径
-            user_desktop_paths = []
-            home_dir = os.path.expanduser("~")
-            
-            # 尝试多种桌面路径
-            possible_desktop_names = ["Desktop", "桌面", "desktop"]
-            for desktop_name in possible_desktop_names:
-                desktop_path = os.path.join(home_dir, desktop_name)
-                if os.path.exists(desktop_path):
-                    user_desktop_paths.append(desktop_path)
-            
-            # 公共桌面路径
-            public_desktop_paths = []
-            if os.environ.get("PUBLIC"):
-                public_desktop_paths.append(os.path.join(os.environ.get("PUBLIC"), "Desktop"))
-            if os.environ.get("ALLUSERSPROFILE"):
-                public_desktop_paths.append(os.path.join(os.environ.get("ALLUSERSPROFILE"), "Desktop"))
-            
-            # 开始菜单路径
-            start_menu_paths = []
-            if os.environ.get("APPDATA"):
-                start_menu_paths.append(os.path.join(os.environ.get("APPDATA"), "Microsoft", "Windows", "Start Menu", "Programs"))
-            if os.environ.get("PROGRAMDATA"):
-                start_menu_paths.append(os.path.join(os.environ.get("PROGRAMDATA"), "Microsoft", "Windows", "Start Menu", "Programs"))
-            
-            # 合并所有搜索路径
-            search_paths = user_desktop_paths + public_desktop_paths + start_menu_paths
-            
-            for search_path in search_paths:
-                if os.path.exists(search_path):
-                    try:
-                        # 如果是桌面路径，也包含文件夹
-                        is_desktop = any(desktop_name in search_path for desktop_name in ["Desktop", "桌面", "desktop"])
-                        
-                        for root, dirs, files in os.walk(search_path):
-                            # 处理文件（快捷方式）
-                            for file in files:
-                                if file.lower().endswith(('.lnk', '.url')):
-                                    app_name = file.replace('.lnk', '').replace('.url', '')
-                                    full_path = os.path.join(root, file)
-                                    shortcuts[app_name.lower()] = full_path
-                            
-                            # 如果是桌面路径，也添加文件夹
-                            if is_desktop and root == search_path:  # 只处理桌面根目录的文件夹
-                                for dir_name in dirs:
-                                    if not dir_name.startswith('.'):  # 忽略隐藏文件夹
-                                        full_path = os.path.join(root, dir_name)
-                                        shortcuts[dir_name.lower()] = full_path
-                    except Exception as e:
-                        print(f"扫描路径 {search_path} 时出错: {e}")
-                        continue
-        return shortcuts
-    
-    @staticmethod
-    def find_best_match(app_name: str, shortcuts: Dict[str, str]) -> tuple:
-        """找到最佳匹配的快捷方式或文件夹"""
-        app_name_lower = app_name.lower().strip()
-        
-        # 1. 完全匹配
-        if app_name_lower in shortcuts:
-            return shortcuts[app_name_lower], "完全匹配"
-        
-        # 2. 双向包含匹配（应用名在快捷方式名中，或快捷方式名在应用名中）
-        best_match = None
-        best_score = 0
-        best_type = ""
-        
-        for shortcut_name, path in shortcuts.items():
-            score = 0
-            match_type = ""
-            
-            # 应用名包含在快捷方式名中
-            if app_name_lower in shortcut_name:
-                score = len(app_name_lower) / len(shortcut_name)
-                item_type = "文件夹" if os.path.isdir(path) else "应用"
-                match_type = f"应用名匹配: {shortcut_name} ({item_type})"
-            
-            # 快捷方式名包含在应用名中（处理"豆包AI"匹配"豆包"的情况）
-            elif shortcut_name in app_name_lower:
-                score = len(shortcut_name) / len(app_name_lower)
-                item_type = "文件夹" if os.path.isdir(path) else "应用"
-                match_type = f"快捷方式匹配: {shortcut_name} ({item_type})"
-            
-            # 开头匹配
-            elif shortcut_name.startswith(app_name_lower) or app_name_lower.startswith(shortcut_name):
-                if shortcut_name.startswith(app_name_lower):
-                    score = len(app_name_lower) / len(shortcut_name)
-                else:
-                    score = len(shortcut_name) / len(app_name_lower)
-                item_type = "文件夹" if os.path.isdir(path) else "应用"
-                match_type = f"开头匹配: {shortcut_name} ({item_type})"
-            
-            # 关键词匹配（去掉常见后缀如AI、软件等）
-            else:
-                # 提取核心关键词
-                app_keywords = app_name_lower.replace('ai', '').replace('软件', '').replace('应用', '').replace('文件夹', '').replace('服务站', '').strip()
-                shortcut_keywords = shortcut_name.replace('ai', '').replace('软件', '').replace('应用', '').replace('文件夹', '').replace('服务站', '').strip()
-                
-                if app_keywords and shortcut_keywords:
-                    if app_keywords in shortcut_keywords or shortcut_keywords in app_keywords:
-                        score = min(len(app_keywords), len(shortcut_keywords)) / max(len(app_keywords), len(shortcut_keywords))
-                        item_type = "文件夹" if os.path.isdir(path) else "应用"
-                        match_type = f"关键词匹配: {shortcut_name} ({item_type})"
-            
-            # 更新最佳匹配
-            if score > best_score:
-                best_score = score
-                best_match = path
-                best_type = match_type
-        
-        # 如果找到了匹配项且分数足够高
-        if best_match and best_score >= 0.2:  # 进一步降低阈值到20%，提高匹配成功率
-            return best_match, best_type
-        
-        # 3. 模糊匹配（字符级别匹配）
-        for shortcut_name, path in shortcuts.items():
-            # 计算共同字符数
-            common_chars = set(app_name_lower) & set(shortcut_name)
-            if common_chars:
-                match_ratio = len(common_chars) / max(len(set(app_name_lower)), len(set(shortcut_name)))
-                if match_ratio >= 0.4:  # 降低字符匹配阈值到40%
-                    item_type = "文件夹" if os.path.isdir(path) else "应用"
-                    return path, f"字符匹配: {shortcut_name} ({item_type})"
-        
-        # 4. 部分匹配（针对中文名称的特殊处理）
-        for shortcut_name, path in shortcuts.items():
-            # 检查是否有任何连续的字符匹配
-            for i in range(len(app_name_lower)):
-                for j in range(i + 2, len(app_name_lower) + 1):  # 至少2个字符
-                    substring = app_name_lower[i:j]
-                    if len(substring) >= 2 and substring in shortcut_name:
-                        item_type = "文件夹" if os.path.isdir(path) else "应用"
-                        return path, f"部分匹配: {shortcut_name} ({item_type})"
-        
-        return None, None
-    
-    @staticmethod
-    def open_application(app_name: str) -> str:
-        """打开指定应用程序或文件夹"""
-        try:
-            if sys.platform == "win32":
-                # Windows系统
-                common_apps = {
-                    "记事本": "notepad",
-                    "计算器": "calc",
-                    "画图": "mspaint",
-                    "浏览器": "start chrome",
-                    "文件管理器": "explorer",
-                    "资源管理器": "explorer",
-                    "任务管理器": "taskmgr",
-                    "控制面板": "control",
-                    "命令提示符": "cmd",
-                    "设置": "ms-settings:",
-                    "系统设置": "ms-settings:",
-                    "注册表编辑器": "regedit",
-                    "服务管理器": "services.msc",
-                    "设备管理器": "devmgmt.msc",
-                    "磁盘管理": "diskmgmt.msc",
-                    "事件查看器": "eventvwr.msc",
-                    "组策略编辑器": "gpedit.msc",
-                    "性能监视器": "perfmon.msc",
-                    "远程桌面": "mstsc",
-                    "PowerShell": "powershell",
-                    "资源监视器": "resmon",
-                    "防火墙": "firewall.cpl",
-                    "网络连接": "ncpa.cpl",
-                    "声音设置": "mmsys.cpl",
-                    "电源选项": "powercfg.cpl",
-                    "系统属性": "sysdm.cpl",
-                    "时间和日期": "timedate.cpl",
-                    "用户账户": "netplwiz",
-                    # 添加系统特殊项目
-                    "计算机": "explorer.exe ::{20D04FE0-3AEA-1069-A2D8-08002B30309D}",
-                    "我的电脑": "explorer.exe ::{20D04FE0-3AEA-1069-A2D8-08002B30309D}",
-                    "此电脑": "explorer.exe ::{20D04FE0-3AEA-1069-A2D8-08002B30309D}",
-                    "回收站": "explorer.exe ::{645FF040-5081-101B-9F08-00AA002F954E}",
-                    "网络": "explorer.exe ::{F02C1A0D-BE21-4350-88B0-7367FC96EF3C}",
-                    "网上邻居": "explorer.exe ::{F02C1A0D-BE21-4350-88B0-7367FC96EF3C}",
-                    "桌面": "explorer.exe shell:desktop",
-                    "文档": "explorer.exe shell:personal",
-                    "下载": "explorer.exe shell:downloads",
-                    "图片": "explorer.exe shell:mypictures",
-                    "音乐": "explorer.exe shell:mymusic",
-                    "视频": "explorer.exe shell:myvideo"
-                }
-                
-                # 首先检查是否为系统内置应用
-                app_name_lower = app_name.lower()
-                matched_key = None
-                
-                # 精确匹配
-                for key in common_apps:
-                    if app_name == key or app_name_lower == key.lower():
-                        matched_key = key
-                        break
-                
-                # 如果没有精确匹配，尝试模糊匹配
-                if not matched_key:
-                    for key in common_apps:
-                        if app_name_lower in key.lower() or key.lower() in app_name_lower:
-                            matched_key = key
-                            break
-                
-                if matched_key:
-                    try:
-                        subprocess.Popen(common_apps[matched_key], shell=True)
-                        return f"✅ 已打开系统项目: {matched_key}"
-                    except Exception as e:
-                        return f"❌ 打开系统项目失败: {e}"
-                
-                # 对于第三方应用和文件夹，先读取所有快捷方式和文件夹
-                print(f"🔍 正在搜索 '{app_name}' 相关的快捷方式...")
-                shortcuts = TaskExecutor.get_all_shortcuts()
-                
-                if not shortcuts:
-                    return f"❌ 未找到任何快捷方式或文件夹，请检查桌面和开始菜单是否有应用程序"
-                
-                # 查找最佳匹配
-                best_match_path, match_type = TaskExecutor.find_best_match(app_name, shortcuts)
-                
-                if best_match_path:
-                    try:
-                        # 判断是文件夹还是快捷方式
-                        if os.path.isdir(best_match_path):
-                            # 是文件夹，用资源管理器打开
-                            subprocess.Popen(f'explorer "{best_match_path}"', shell=True)
-                            folder_name = os.path.basename(best_match_path)
-                            return f"✅ 已打开文件夹: {folder_name} ({match_type})"
-                        else:
-                            # 是快捷方式文件，直接启动
-                            os.startfile(best_match_path)
-                            shortcut_name = os.path.basename(best_match_path).replace('.lnk', '').replace('.url', '')
-                            return f"✅ 已打开应用: {shortcut_name} ({match_type})"
-                    except Exception as e:
-                        # 如果os.startfile失败，尝试使用subprocess
-                        try:
-                            if os.path.isdir(best_match_path):
-                                subprocess.Popen(f'explorer "{best_match_path}"', shell=True)
-                                folder_name = os.path.basename(best_match_path)
-                                return f"✅ 已打开文件夹: {folder_name} ({match_type})"
-                            else:
-                                subprocess.Popen(f'start "" "{best_match_path}"', shell=True)
-                                shortcut_name = os.path.basename(best_match_path).replace('.lnk', '').replace('.url', '')
-                                return f"✅ 已打开应用: {shortcut_name} ({match_type})"
-                        except Exception as e2:
-                            return f"❌ 找到匹配项但启动失败: {best_match_path}\n错误信息: {e2}"
-                else:
-                    # 显示可用的快捷方式和文件夹供用户参考
-                    available_items = list(shortcuts.keys())[:10]  # 显示前10个
-                    items_list = "、".join(available_items)
-                    return f"❌ 未找到与 '{app_name}' 匹配的应用程序或文件夹\n💡 可用的项目包括: {items_list}{'...' if len(shortcuts) > 10 else ''}"
-                    
-            else:
-                return f"❌ 此功能目前仅支持Windows系统"
-                
-        except Exception as e:
-            return f"❌ 打开应用失败: {e}"
-            
-    @staticmethod
-    def system_power_action(action: str) -> str:
-        """执行系统电源相关操作"""
-        try:
-            if sys.platform == "win32":
-                # Windows系统
-                if action == "关机":
-                    print(f"\n⚠️  即将执行关机操作")
-                    print("📋 是否确认关机？系统将在60秒后关机。")
-                    confirm = input("请输入 (y/n): ").strip().lower()
-                    if confirm not in ['y', 'yes', '是', '确认']:
-                        return "❌ 关机操作已取消"
-                    subprocess.Popen("shutdown /s /t 60", shell=True)
-                    return "✅ 系统将在60秒后关机，请保存您的工作。输入'取消关机'可取消。"
-                elif action == "取消关机":
-                    subprocess.Popen("shutdown /a", shell=True)
-                    return "✅ 已取消关机操作。"
-                elif action == "重启":
-                    print(f"\n⚠️  即将执行重启操作")
-                    print("📋 是否确认重启？系统将在60秒后重启。")
-                    confirm = input("请输入 (y/n): ").strip().lower()
-                    if confirm not in ['y', 'yes', '是', '确认']:
-                        return "❌ 重启操作已取消"
-                    subprocess.Popen("shutdown /r /t 60", shell=True)
-                    return "✅ 系统将在60秒后重启，请保存您的工作。输入'取消重启'可取消。"
-                elif action == "取消重启":
-                    subprocess.Popen("shutdown /a", shell=True)
-                    return "✅ 已取消重启操作。"
-                elif action == "注销":
-                    print(f"\n⚠️  即将执行注销操作")
-                    print("📋 是否确认注销当前用户？")
-                    confirm = input("请输入 (y/n): ").strip().lower()
-                    if confirm not in ['y', 'yes', '是', '确认']:
-                        return "❌ 注销操作已取消"
-                    subprocess.Popen("shutdown /l", shell=True)
-                    return "✅ 正在注销当前用户..."
-                elif action == "休眠":
-                    print(f"\n⚠️  即将执行休眠操作")
-                    print("📋 是否确认让系统进入休眠状态？")
-                    confirm = input("请输入 (y/n): ").strip().lower()
-                    if confirm not in ['y', 'yes', '是', '确认']:
-                        return "❌ 休眠操作已取消"
-                    subprocess.Popen("rundll32.exe powrprof.dll,SetSuspendState 0,1,0", shell=True)
-                    return "✅ 系统正在进入休眠状态..."
-                elif action == "睡眠":
-                    print(f"\n⚠️  即将执行睡眠操作")
-                    print("📋 是否确认让系统进入睡眠状态？")
-                    confirm = input("请输入 (y/n): ").strip().lower()
-                    if confirm not in ['y', 'yes', '是', '确认']:
-                        return "❌ 睡眠操作已取消"
-                    subprocess.Popen("rundll32.exe powrprof.dll,SetSuspendState 0,1,0", shell=True)
-                    return "✅ 系统正在进入睡眠状态..."
-                elif action == "锁定":
-                    # 锁定操作相对安全，不需要确认
-                    subprocess.Popen("rundll32.exe user32.dll,LockWorkStation", shell=True)
-                    return "✅ 已锁定计算机。"
-                else:
-                    return f"❌ 不支持的系统操作: {action}"
-            else:
-                return f"❌ 此功能目前仅支持Windows系统"
-        except Exception as e:
-            return f"❌ 执行系统操作失败: {e}"
-    
-    @staticmethod
-    def clean_system_junk() -> str:
-        """清理系统垃圾和缓存文件"""
-        try:
-            if sys.platform != "win32":
-                return "❌ 此功能目前仅支持Windows系统"
-            
-            print(f"\n🧹 即将执行系统清理操作")
-            print("📋 将清理以下内容:")
-            print("   • 临时文件 (%TEMP%)")
-            print("   • Windows临时文件 (C:\\Windows\\Temp)")
-            print("   • 回收站")
-            print("   • 浏览器缓存 (Chrome, Edge)")
-            print("   • 系统缓存文件")
-            print("   • 预读取文件")
-            print("⚠️  注意: 此操作将删除临时文件，可能影响某些程序的运行状态")
-            
-            confirm = input("是否确认执行清理操作？(y/n): ").strip().lower()
-            if confirm not in ['y', 'yes', '是', '确认']:
-                return "❌ 清理操作已取消"
-            
-            results = []
-            cleaned_size = 0
-            
-            # 1. 清理用户临时文件
-            try:
-                temp_path = os.environ.get('TEMP', '')
-                if temp_path and os.path.exists(temp_path):
-                    print("🔄 正在清理用户临时文件...")
-                    size_before = TaskExecutor._get_folder_size(temp_path)
-                    TaskExecutor._clean_folder(temp_path, keep_folder=True)
-                    size_after = TaskExecutor._get_folder_size(temp_path)
-                    cleaned = size_before - size_after
-                    cleaned_size += cleaned
-                    results.append(f"✅ 用户临时文件: 清理了 {TaskExecutor._format_size(cleaned)}")
-            except Exception as e:
-                results.append(f"⚠️ 用户临时文件清理失败: {e}")
-            
-            # 2. 清理Windows临时文件
-            try:
-                win_temp_path = "C:\\Windows\\Temp"
-                if os.path.exists(win_temp_path):
-                    print("🔄 正在清理Windows临时文件...")
-                    size_before = TaskExecutor._get_folder_size(win_temp_path)
-                    TaskExecutor._clean_folder(win_temp_path, keep_folder=True)
-                    size_after = TaskExecutor._get_folder_size(win_temp_path)
-                    cleaned = size_before - size_after
-                    cleaned_size += cleaned
-                    results.append(f"✅ Windows临时文件: 清理了 {TaskExecutor._format_size(cleaned)}")
-            except Exception as e:
-                results.append(f"⚠️ Windows临时文件清理失败: {e}")
-            
-            # 3. 清理回收站
-            try:
-                print("🔄 正在清理回收站...")
-                subprocess.run("PowerShell.exe -Command Clear-RecycleBin -Force", 
-                             shell=True, capture_output=True, text=True, timeout=30)
-                results.append("✅ 回收站: 已清空")
-            except Exception as e:
-                results.append(f"⚠️ 回收站清理失败: {e}")
-            
-            # 4. 清理预读取文件
-            try:
-                prefetch_path = "C:\\Windows\\Prefetch"
-                if os.path.exists(prefetch_path):
-                    print("🔄 正在清理预读取文件...")
-                    size_before = TaskExecutor._get_folder_size(prefetch_path)
-                    TaskExecutor._clean_folder(prefetch_path, keep_folder=True, file_pattern="*.pf")
-                    size_after = TaskExecutor._get_folder_size(prefetch_path)
-                    cleaned = size_before - size_after
-                    cleaned_size += cleaned
-                    results.append(f"✅ 预读取文件: 清理了 {TaskExecutor._format_size(cleaned)}")
-            except Exception as e:
-                results.append(f"⚠️ 预读取文件清理失败: {e}")
-            
-            # 5. 清理浏览器缓存
-            try:
-                print("🔄 正在清理浏览器缓存...")
-                browser_cleaned = TaskExecutor._clean_browser_cache()
-                cleaned_size += browser_cleaned
-                results.append(f"✅ 浏览器缓存: 清理了 {TaskExecutor._format_size(browser_cleaned)}")
-            except Exception as e:
-                results.append(f"⚠️ 浏览器缓存清理失败: {e}")
-            
-            # 6. 运行磁盘清理
-            try:
-                print("🔄 正在运行系统磁盘清理...")
-                subprocess.Popen("cleanmgr /sagerun:1", shell=True)
-                results.append("✅ 系统磁盘清理: 已启动（在后台运行）")
-            except Exception as e:
-                results.append(f"⚠️ 系统磁盘清理启动失败: {e}")
-            
-            # 生成总结
-            summary = f"\n🎯 清理完成! 总共释放了约 {TaskExecutor._format_size(cleaned_size)} 的磁盘空间"
-            return '\n'.join(results) + summary
-            
-        except Exception as e:
-            return f"❌ 系统清理失败: {e}"
-    
-    @staticmethod
-    def _get_folder_size(folder_path: str) -> int:
-        """获取文件夹大小（字节）"""
-        total_size = 0
-        try:
-            for dirpath, dirnames, filenames in os.walk(folder_path):
-                for filename in filenames:
-                    try:
-                        file_path = os.path.join(dirpath, filename)
-                        if os.path.exists(file_path):
-                            total_size += os.path.getsize(file_path)
-                    except (OSError, FileNotFoundError):
-                        continue
-        except Exception:
-            pass
-        return total_size
-    
-    @staticmethod
-    def _clean_folder(folder_path: str, keep_folder: bool = True, file_pattern: str = "*"):
-        """清理文件夹内容"""
-        try:
-            import glob
-            if file_pattern == "*":
-                # 删除所有文件和子文件夹
-                for root, dirs, files in os.walk(folder_path, topdown=False):
-                    # 删除文件
-                    for file in files:
-                        try:
-                            file_path = os.path.join(root, file)
-                            os.remove(file_path)
-                        except (OSError, PermissionError):
-                            continue
-                    # 删除空文件夹
-                    for dir_name in dirs:
-                        try:
-                            dir_path = os.path.join(root, dir_name)
-                            if dir_path != folder_path:  # 不删除根文件夹
-                                os.rmdir(dir_path)
-                        except (OSError, PermissionError):
-                            continue
-            else:
-                # 按模式删除特定文件
-                pattern_path = os.path.join(folder_path, file_pattern)
-                for file_path in glob.glob(pattern_path):
-                    try:
-                        if os.path.isfile(file_path):
-                            os.remove(file_path)
-                    except (OSError, PermissionError):
-                        continue
-        except Exception:
-            pass
-    
-    @staticmethod
-    def _clean_browser_cache() -> int:
-        """清理浏览器缓存"""
-        total_cleaned = 0
-        try:
-            user_profile = os.environ.get('USERPROFILE', '')
-            if not user_profile:
-                return 0
-            
-            # Chrome缓存路径
-            chrome_cache_paths = [
-                os.path.join(user_profile, "AppData", "Local", "Google", "Chrome", "User Data", "Default", "Cache"),
-                os.path.join(user_profile, "AppData", "Local", "Google", "Chrome", "User Data", "Default", "Code Cache"),
-            ]
-            
-            # Edge缓存路径
-            edge_cache_paths = [
-                os.path.join(user_profile, "AppData", "Local", "Microsoft", "Edge", "User Data", "Default", "Cache"),
-                os.path.join(user_profile, "AppData", "Local", "Microsoft", "Edge", "User Data", "Default", "Code Cache"),
-            ]
-            
-            all_cache_paths = chrome_cache_paths + edge_cache_paths
-            
-            for cache_path in all_cache_paths:
-                if os.path.exists(cache_path):
-                    try:
-                        size_before = TaskExecutor._get_folder_size(cache_path)
-                        TaskExecutor._clean_folder(cache_path, keep_folder=True)
-                        size_after = TaskExecutor._get_folder_size(cache_path)
-                        total_cleaned += (size_before - size_after)
-                    except Exception:
-                        continue
-                        
-        except Exception:
-            pass
-        
-        return total_cleaned
-    
-    @staticmethod
-    def _format_size(size_bytes: int) -> str:
-        """格式化文件大小显示"""
-        if size_bytes == 0:
-            return "0 B"
-        
-        size_names = ["B", "KB", "MB", "GB", "TB"]
-        import math
-        i = int(math.floor(math.log(size_bytes, 1024)))
-        p = math.pow(1024, i)
-        s = round(size_bytes / p, 2)
-        return f"{s} {size_names[i]}"
-    
-    @staticmethod
-    def get_system_info() -> str:
-        """获取系统信息"""
-        try:
-            import platform
-            info = f"""
-📊 系统信息:
-- 操作系统: {platform.system()} {platform.release()}
-- 处理器: {platform.processor()}
-- Python版本: {platform.python_version()}
-- 当前时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
-            """
-            return info.strip()
-        except Exception as e:
-            return f"❌ 获取系统信息失败: {e}"
-    
-    @staticmethod
-    def system_control_action(action: str, params: str = "") -> str:
-        """执行系统控制操作（需要用户确认）"""
-        try:
-            if sys.platform != "win32":
-                return "❌ 此功能目前仅支持Windows系统"
-            
-            action_lower = action.lower()
-            
-            # WiFi控制
-            if action_lower in ["关闭wifi", "禁用wifi", "断开wifi"]:
-                print(f"\n⚠️  即将关闭WiFi连接")
-                print("📋 是否确认关闭WiFi？这将断开所有无线网络连接。")
-                confirm = input("请输入 (y/n): ").strip().lower()
-                if confirm not in ['y', 'yes', '是', '确认']:
-                    return "❌ WiFi关闭操作已取消"
-                
-                try:
-                    # 使用netsh命令禁用WiFi
-                    result = subprocess.run('netsh interface set interface "Wi-Fi" admin=disable', 
-                                          shell=True, capture_output=True, text=True, timeout=10)
-                    if result.returncode == 0:
-                        return "✅ WiFi已关闭"
-                    else:
-                        # 尝试其他可能的WiFi接口名称
-                        interfaces = ["WLAN", "无线网络连接", "Wireless Network Connection"]
-                        for interface in interfaces:
-                            try:
-                                result = subprocess.run(f'netsh interface set interface "{interface}" admin=disable', 
-                                                      shell=True, capture_output=True, text=True, timeout=10)
-                                if result.returncode == 0:
-                                    return f"✅ WiFi已关闭 (接口: {interface})"
-                            except:
-                                continue
-                        return "❌ 无法找到WiFi网络接口，请手动关闭"
-                except Exception as e:
-                    return f"❌ 关闭WiFi失败: {e}"
-            
-            elif action_lower in ["开启wifi", "启用wifi", "连接wifi"]:
-                print(f"\n🔄 即将开启WiFi连接")
-                print("📋 是否确认开启WiFi？")
-                confirm = input("请输入 (y/n): ").strip().lower()
-                if confirm not in ['y', 'yes', '是', '确认']:
-                    return "❌ WiFi开启操作已取消"
-                
-                try:
-                    # 使用netsh命令启用WiFi
-                    result = subprocess.run('netsh interface set interface "Wi-Fi" admin=enable', 
-                                          shell=True, capture_output=True, text=True, timeout=10)
-                    if result.returncode == 0:
-                        return "✅ WiFi已开启"
-                    else:
-                        # 尝试其他可能的WiFi接口名称
-                        interfaces = ["WLAN", "无线网络连接", "Wireless Network Connection"]
-                        for interface in interfaces:
-                            try:
-                                result = subprocess.run(f'netsh interface set interface "{interface}" admin=enable', 
-                                                      shell=True, capture_output=True, text=True, timeout=10)
-                                if result.returncode == 0:
-                                    return f"✅ WiFi已开启 (接口: {interface})"
-                            except:
-                                continue
-                        return "❌ 无法找到WiFi网络接口，请手动开启"
-                except Exception as e:
-                    return f"❌ 开启WiFi失败: {e}"
-            
-            # 音量控制
-            elif action_lower in ["调节音量", "设置音量", "音量"]:
-                if not params:
-                    return "❌ 请指定音量值，例如：调节音量 50（设置为50%）"
-                
-                try:
-                    volume = int(params.strip().replace('%', ''))
-                    if not 0 <= volume <= 100:
-                        return "❌ 音量值必须在0-100之间"
-                    
-                    print(f"\n🔊 即将设置系统音量为 {volume}%")
-                    print("📋 是否确认调节音量？")
-                    confirm = input("请输入 (y/n): ").strip().lower()
-                    if confirm not in ['y', 'yes', '是', '确认']:
-                        return "❌ 音量调节操作已取消"
-                    
-                    # 使用PowerShell设置音量
-                    ps_command = f"""
-Add-Type -TypeDefinition @'
-using System.Runtime.InteropServices;
+try:
+    import orjson  # 可选依赖：更快的JSON编解码
+except ImportError:
+    orjson = None
+
+try:
+    # 可选依赖：带历史记录和行编辑的输入提示符
+    from prompt_toolkit import PromptSession
+    from prompt_toolkit.history import FileHistory
+    from prompt_toolkit.patch_stdout import patch_stdout
+except ImportError:
+    PromptSession = None
+
+try:
+    # 可选依赖（仅Windows）：直接调用系统音频接口调节音量和静音，不必启动PowerShell
+    from comtypes import CLSCTX_ALL
+    from pycaw.pycaw import AudioUtilities, IAudioEndpointVolume
+except ImportError:
+    AudioUtilities = None
+
+if orjson is not None:
+    _json_dumps = orjson.dumps
+    _json_loads = orjson.loads
+else:
+    def _json_dumps(obj) -> bytes:
+        return json.dumps(obj, ensure_ascii=False).encode('utf-8')
+    _json_loads = json.loads
+
+def _iter_ndjson_lines(chunks):
+    """把读取到的字节块按换行切分为非空的NDJSON行（每块只切分一次，跨块的半行留到下一块）"""
+    pending = b""
+    for chunk in chunks:
+        lines = (pending + chunk).split(b"\n")
+        pending = lines.pop()
+        for line in lines:
+            if line:
+                yield line
+    if pending:
+        yield pending
+
+# AI回复中的任务标记：[TASK:类型]参数[/TASK]；只有写入文件任务的内容允许跨行，
+# 其他任务的参数不能跨行，缺少[/TASK]的标记不会吞掉后面几行中的有效任务
+_TASK_RE = re.compile(r'\[TASK:(?:(?P<write_kind>WRITE_FILE)\](?P<write_body>(?s:.*?))'
+                      r'|(?P<kind>[A-Z_]+)\](?P<body>[^\n]*?))\[/TASK\]')
+
+# 请求Ollama在两次对话之间保持模型常驻的时长（默认仅5分钟），
+# 模型不被卸载时，已预填充的系统提示词KV缓存可被后续请求按前缀复用
+_OLLAMA_KEEP_ALIVE = "30m"
+
+# 预热时最多生成的token数：预热的主要开销是加载模型和预填充系统提示词，回复只用于显示确认
+_WARMUP_NUM_PREDICT = 16
+
+# 预热请求遇到连接失败或超时时的重试次数
+_WARMUP_RETRIES = 2
+
+# 流式对话时每次从连接读取的最大字节数
+_STREAM_CHUNK_SIZE = 65536
+
+# Windows系统内置应用及特殊项目 -> 启动命令
+_COMMON_APPS = types.MappingProxyType({
+    "记事本": "notepad",
+    "计算器": "calc",
+    "画图": "mspaint",
+    "浏览器": "start chrome",
+    "文件管理器": "explorer",
+    "资源管理器": "explorer",
+    "任务管理器": "taskmgr",
+    "控制面板": "control",
+    "命令提示符": "cmd",
+    "设置": "ms-settings:",
+    "系统设置": "ms-settings:",
+    "注册表编辑器": "regedit",
+    "服务管理器": "services.msc",
+    "设备管理器": "devmgmt.msc",
+    "磁盘管理": "diskmgmt.msc",
+    "事件查看器": "eventvwr.msc",
+    "组策略编辑器": "gpedit.msc",
+    "性能监视器": "perfmon.msc",
+    "远程桌面": "mstsc",
+    "PowerShell": "powershell",
+    "资源监视器": "resmon",
+    "防火墙": "firewall.cpl",
+    "网络连接": "ncpa.cpl",
+    "声音设置": "mmsys.cpl",
+    "电源选项": "powercfg.cpl",
+    "系统属性": "sysdm.cpl",
+    "时间和日期": "timedate.cpl",
+    "用户账户": "netplwiz",
+    # 添加系统特殊项目
+    "计算机": "explorer.exe ::{20D04FE0-3AEA-1069-A2D8-08002B30309D}",
+    "我的电脑": "explorer.exe ::{20D04FE0-3AEA-1069-A2D8-08002B30309D}",
+    "此电脑": "explorer.exe ::{20D04FE0-3AEA-1069-A2D8-08002B30309D}",
+    "回收站": "explorer.exe ::{645FF040-5081-101B-9F08-00AA002F954E}",
+    "网络": "explorer.exe ::{F02C1A0D-BE21-4350-88B0-7367FC96EF3C}",
+    "网上邻居": "explorer.exe ::{F02C1A0D-BE21-4350-88B0-7367FC96EF3C}",
+    "桌面": "explorer.exe shell:desktop",
+    "文档": "explorer.exe shell:personal",
+    "下载": "explorer.exe shell:downloads",
+    "图片": "explorer.exe shell:mypictures",
+    "音乐": "explorer.exe shell:mymusic",
+    "视频": "explorer.exe shell:myvideo"
+})
+
+# 小写名称 -> (原始名称, 启动命令)，用于不区分大小写的精确匹配和模糊匹配
+_COMMON_APPS_LOWER = types.MappingProxyType(
+    {key.lower(): (key, command) for key, command in _COMMON_APPS.items()})
+
+# 启动时读取一次的用户目录和环境变量
+_HOME_DIR = os.path.expanduser("~")
+_ENV_PUBLIC = os.environ.get("PUBLIC")
+_ENV_ALLUSERSPROFILE = os.environ.get("ALLUSERSPROFILE")
+_ENV_APPDATA = os.environ.get("APPDATA")
+_ENV_PROGRAMDATA = os.environ.get("PROGRAMDATA")
+_ENV_TEMP = os.environ.get("TEMP", "")
+_ENV_USERPROFILE = os.environ.get("USERPROFILE", "")
+
+# 快捷方式搜索根目录候选：用户桌面（多种命名）、公共桌面、开始菜单
+_USER_DESKTOP_CANDIDATES = [os.path.join(_HOME_DIR, name) for name in ("Desktop", "桌面", "desktop")]
+_PUBLIC_DESKTOP_PATHS = [os.path.join(root, "Desktop") for root in (_ENV_PUBLIC, _ENV_ALLUSERSPROFILE) if root]
+_START_MENU_PATHS = [os.path.join(root, "Microsoft", "Windows", "Start Menu", "Programs")
+                     for root in (_ENV_APPDATA, _ENV_PROGRAMDATA) if root]
+
+# 主对话输入的历史记录文件（安装prompt_toolkit时使用，可用上下键找回之前的输入）
+_INPUT_HISTORY_FILE = os.path.join(_HOME_DIR, ".zhiling_history")
+
+# 需要用户确认的操作中表示同意的输入（已去空白并转小写）
+_CONFIRM_ANSWERS = frozenset({'y', 'yes', '是', '确认'})
+# 一次回复包含多个任务时，表示同意本轮其余全部操作的输入
+_CONFIRM_ALL_ANSWERS = frozenset({'ya', '全部确认'})
+
+# 清空回收站时传给SHEmptyRecycleBinW的标志：不弹确认框、不显示进度、不播放声音
+_SHERB_FLAGS = 0x1 | 0x2 | 0x4
+# SHEmptyRecycleBinW视为成功的返回值（按无符号32位比较）：S_OK，以及回收站本来就为空时返回的E_UNEXPECTED
+_SHERB_SUCCESS_HRESULTS = frozenset({0x0, 0x8000FFFF})
+
+# PowerShell调节音量时使用的C#辅助类源码，以及编译后的DLL路径（首次使用时编译，之后直接加载）
+_AUDIO_HELPER_SOURCE = """using System.Runtime.InteropServices;
 [Guid("5CDF2C82-841E-4546-9722-0CF74078229A"), InterfaceType(ComInterfaceType.InterfaceIsIUnknown)]
-interface IAudioEndpointVolume {{
+interface IAudioEndpointVolume {
     int f(); int g(); int h(); int i();
     int SetMasterVolumeLevelScalar(float fLevel, System.Guid pguidEventContext);
     int j(); int k(); int l(); int m(); int n();
     int GetMasterVolumeLevelScalar(out float pfLevel);
-}}
+}
 [Guid("D666063F-1587-4E43-81F1-B948E807363F"), InterfaceType(ComInterfaceType.InterfaceIsIUnknown)]
-interface IMMDevice {{
+interface IMMDevice {
     int Activate(ref System.Guid id, int clsCtx, int activationParams, out IAudioEndpointVolume aev);
-}}
+}
 [Guid("A95664D2-9614-4F35-A746-DE8DB63617E6"), InterfaceType(ComInterfaceType.InterfaceIsIUnknown)]
-interface IMMDeviceEnumerator {{
+interface IMMDeviceEnumerator {
     int f(); int GetDefaultAudioEndpoint(int dataFlow, int role, out IMMDevice endpoint);
-}}
-[ComImport, Guid("BCDE0395-E52F-467C-8E3D-C4579291692E")] class MMDeviceEnumeratorComObject {{ }}
-public class Audio {{
-    static IAudioEndpointVolume Vol() {{
+}
+[ComImport, Guid("BCDE0395-E52F-467C-8E3D-C4579291692E")] class MMDeviceEnumeratorComObject { }
+public class Audio {
+    static IAudioEndpointVolume Vol() {
         var enumerator = new MMDeviceEnumeratorComObject() as IMMDeviceEnumerator;
         IMMDevice dev = null;
         Marshal.ThrowExceptionForHR(enumerator.GetDefaultAudioEndpoint(0, 0, out dev));
@@ -752,231 +188,153 @@ public class Audio {{
         var epvid = typeof(IAudioEndpointVolume).GUID;
         Marshal.ThrowExceptionForHR(dev.Activate(ref epvid, 23, 0, out epv));
         return epv;
-    }}
-    public static float GetVolume() {{ float v = -1; Marshal.ThrowExceptionForHR(Vol().GetMasterVolumeLevelScalar(out v)); return v; }}
-    public static void SetVolume(float v) {{ Marshal.ThrowExceptionForHR(Vol().SetMasterVolumeLevelScalar(v, System.Guid.Empty)); }}
-}}
-'@
-[Audio]::SetVolume({volume / 100.0})
-"""
-                    result = subprocess.run(f'PowerShell.exe -Command "{ps_command}"', 
-                                          shell=True, capture_output=True, text=True, timeout=15)
-                    if result.returncode == 0:
-                        return f"✅ 系统音量已设置为 {volume}%"
-                    else:
-                        return f"❌ 音量调节失败: {result.stderr}"
-                        
-                except ValueError:
-                    return "❌ 音量值必须是数字"
-                except Exception as e:
-                    return f"❌ 音量调节失败: {e}"
-            
-            elif action_lower in ["静音", "关闭声音"]:
-                print(f"\n🔇 即将设置系统静音")
-                print("📋 是否确认静音？")
-                confirm = input("请输入 (y/n): ").strip().lower()
-                if confirm not in ['y', 'yes', '是', '确认']:
-                    return "❌ 静音操作已取消"
-                
-                try:
-                    # 使用nircmd设置静音（如果可用）或PowerShell
-                    result = subprocess.run('PowerShell.exe -Command "(New-Object -comObject WScript.Shell).SendKeys([char]173)"', 
-                                          shell=True, capture_output=True, text=True, timeout=10)
-                    return "✅ 系统已静音"
-                except Exception as e:
-                    return f"❌ 静音操作失败: {e}"
-            
-            # 启动任务管理器
-            elif action_lower in ["任务管理器", "打开任务管理器", "启动任务管理器"]:
-                try:
-                    subprocess.Popen("taskmgr", shell=True)
-                    return "✅ 任务管理器已启动"
-                except Exception as e:
-                    return f"❌ 启动任务管理器失败: {e}"
-            
-            # 启动设备管理器
-            elif action_lower in ["设备管理器", "打开设备管理器", "启动设备管理器"]:
-                print(f"\n⚙️ 即将启动设备管理器")
-                print("📋 是否确认启动设备管理器？")
-                confirm = input("请输入 (y/n): ").strip().lower()
-                if confirm not in ['y', 'yes', '是', '确认']:
-                    return "❌ 设备管理器启动已取消"
-                
-                try:
-                    subprocess.Popen("devmgmt.msc", shell=True)
-                    return "✅ 设备管理器已启动"
-                except Exception as e:
-                    return f"❌ 启动设备管理器失败: {e}"
-            
-            # 启动服务管理器
-            elif action_lower in ["服务管理器", "服务", "打开服务"]:
-                print(f"\n⚙️ 即将启动服务管理器")
-                print("📋 是否确认启动服务管理器？")
-                confirm = input("请输入 (y/n): ").strip().lower()
-                if confirm not in ['y', 'yes', '是', '确认']:
-                    return "❌ 服务管理器启动已取消"
-                
-                try:
-                    subprocess.Popen("services.msc", shell=True)
-                    return "✅ 服务管理器已启动"
-                except Exception as e:
-                    return f"❌ 启动服务管理器失败: {e}"
-            
-            # 启动注册表编辑器
-            elif action_lower in ["注册表编辑器", "注册表", "regedit"]:
-                print(f"\n⚠️  即将启动注册表编辑器")
-                print("📋 注册表编辑器是高级系统工具，错误操作可能导致系统问题")
-                print("📋 是否确认启动注册表编辑器？")
-                confirm = input("请输入 (y/n): ").strip().lower()
-                if confirm not in ['y', 'yes', '是', '确认']:
-                    return "❌ 注册表编辑器启动已取消"
-                
-                try:
-                    subprocess.Popen("regedit", shell=True)
-                    return "✅ 注册表编辑器已启动"
-                except Exception as e:
-                    return f"❌ 启动注册表编辑器失败: {e}"
-            
-            # 启动系统配置
-            elif action_lower in ["系统配置", "msconfig"]:
-                print(f"\n⚙️ 即将启动系统配置")
-                print("📋 是否确认启动系统配置工具？")
-                confirm = input("请输入 (y/n): ").strip().lower()
-                if confirm not in ['y', 'yes', '是', '确认']:
-                    return "❌ 系统配置启动已取消"
-                
-                try:
-                    subprocess.Popen("msconfig", shell=True)
-                    return "✅ 系统配置已启动"
-                except Exception as e:
-                    return f"❌ 启动系统配置失败: {e}"
-            
-            # 启动命令提示符
-            elif action_lower in ["命令提示符", "cmd", "终端"]:
-                try:
-                    subprocess.Popen("cmd", shell=True)
-                    return "✅ 命令提示符已启动"
-                except Exception as e:
-                    return f"❌ 启动命令提示符失败: {e}"
-            
-            # 启动PowerShell
-            elif action_lower in ["powershell", "ps"]:
-                try:
-                    subprocess.Popen("powershell", shell=True)
-                    return "✅ PowerShell已启动"
-                except Exception as e:
-                    return f"❌ 启动PowerShell失败: {e}"
-            
-            # 显示系统信息
-            elif action_lower in ["系统信息", "系统属性"]:
-                try:
-                    subprocess.Popen("msinfo32", shell=True)
-                    return "✅ 系统信息已启动"
-                except Exception as e:
-                    return f"❌ 启动系统信息失败: {e}"
-            
-            # 启动磁盘管理
-            elif action_lower in ["磁盘管理", "磁盘"]:
-                print(f"\n💽 即将启动磁盘管理")
-                print("📋 是否确认启动磁盘管理？")
-                confirm = input("请输入 (y/n): ").strip().lower()
-                if confirm not in ['y', 'yes', '是', '确认']:
-                    return "❌ 磁盘管理启动已取消"
-                
-                try:
-                    subprocess.Popen("diskmgmt.msc", shell=True)
-                    return "✅ 磁盘管理已启动"
-                except Exception as e:
-                    return f"❌ 启动磁盘管理失败: {e}"
-            
-            # 启动事件查看器
-            elif action_lower in ["事件查看器", "事件日志"]:
-                print(f"\n📋 即将启动事件查看器")
-                print("📋 是否确认启动事件查看器？")
-                confirm = input("请输入 (y/n): ").strip().lower()
-                if confirm not in ['y', 'yes', '是', '确认']:
-                    return "❌ 事件查看器启动已取消"
-                
-                try:
-                    subprocess.Popen("eventvwr.msc", shell=True)
-                    return "✅ 事件查看器已启动"
-                except Exception as e:
-                    return f"❌ 启动事件查看器失败: {e}"
-            
-            # 启动性能监视器
-            elif action_lower in ["性能监视器", "性能监控"]:
-                try:
-                    subprocess.Popen("perfmon.msc", shell=True)
-                    return "✅ 性能监视器已启动"
-                except Exception as e:
-                    return f"❌ 启动性能监视器失败: {e}"
-            
-            # 启动资源监视器
-            elif action_lower in ["资源监视器", "资源监控"]:
-                try:
-                    subprocess.Popen("resmon", shell=True)
-                    return "✅ 资源监视器已启动"
-                except Exception as e:
-                    return f"❌ 启动资源监视器失败: {e}"
-            
-            # 启动控制面板
-            elif action_lower in ["控制面板"]:
-                try:
-                    subprocess.Popen("control", shell=True)
-                    return "✅ 控制面板已启动"
-                except Exception as e:
-                    return f"❌ 启动控制面板失败: {e}"
-            
-            # 启动Windows设置
-            elif action_lower in ["windows设置", "设置", "系统设置"]:
-                try:
-                    subprocess.Popen("ms-settings:", shell=True)
-                    return "✅ Windows设置已启动"
-                except Exception as e:
-                    return f"❌ 启动Windows设置失败: {e}"
-            
-            else:
-                return f"❌ 不支持的系统控制操作: {action}\n💡 支持的操作包括: WiFi控制、音量调节、启动系统工具等"
-                
-        except Exception as e:
-            return f"❌ 执行系统控制操作失败: {e}"
-#!/usr/bin/env python3
-# -*- coding: utf-8 -*-
-"""
-AI桌面助手 - 基于Ollama的本地AI对话助手
-支持与本地Ollama模型对话并执行特定任务
+    }
+    public static float GetVolume() { float v = -1; Marshal.ThrowExceptionForHR(Vol().GetMasterVolumeLevelScalar(out v)); return v; }
+    public static void SetVolume(float v) { Marshal.ThrowExceptionForHR(Vol().SetMasterVolumeLevelScalar(v, System.Guid.Empty)); }
+}
 """
+_AUDIO_HELPER_DLL = os.path.join(_HOME_DIR, ".zhiling_audio_helper.dll")
 
-import json
-import subprocess
-import sys
-import os
-import re
-import shutil
-from typing import List, Dict, Optional
-import requests
-from datetime import datetime
+# 系统控制操作的各种说法（小写） -> 操作名
+_SYSTEM_CONTROL_ACTIONS = {
+    "关闭wifi": "关闭wifi", "禁用wifi": "关闭wifi", "断开wifi": "关闭wifi",
+    "开启wifi": "开启wifi", "启用wifi": "开启wifi", "连接wifi": "开启wifi",
+    "调节音量": "调节音量", "设置音量": "调节音量", "音量": "调节音量",
+    "静音": "静音", "关闭声音": "静音",
+    "任务管理器": "任务管理器", "打开任务管理器": "任务管理器", "启动任务管理器": "任务管理器",
+    "设备管理器": "设备管理器", "打开设备管理器": "设备管理器", "启动设备管理器": "设备管理器",
+    "服务管理器": "服务管理器", "服务": "服务管理器", "打开服务": "服务管理器",
+    "注册表编辑器": "注册表编辑器", "注册表": "注册表编辑器", "regedit": "注册表编辑器",
+    "系统配置": "系统配置", "msconfig": "系统配置",
+    "命令提示符": "命令提示符", "cmd": "命令提示符", "终端": "命令提示符",
+    "powershell": "powershell", "ps": "powershell",
+    "系统信息": "系统信息", "系统属性": "系统信息",
+    "磁盘管理": "磁盘管理", "磁盘": "磁盘管理",
+    "事件查看器": "事件查看器", "事件日志": "事件查看器",
+    "性能监视器": "性能监视器", "性能监控": "性能监视器",
+    "资源监视器": "资源监视器", "资源监控": "资源监视器",
+    "控制面板": "控制面板",
+    "windows设置": "windows设置", "设置": "windows设置", "系统设置": "windows设置",
+}
+
+# 系统工具操作名 -> (显示名, 启动目标, 是否经shell启动, 启动前打印的确认提示；None表示无需确认)
+_SYSTEM_TOOLS = {
+    "任务管理器": ("任务管理器", "taskmgr", False, None),
+    "设备管理器": ("设备管理器", "devmgmt.msc", False,
+              ("\n⚙️ 即将启动设备管理器", "📋 是否确认启动设备管理器？")),
+    "服务管理器": ("服务管理器", "services.msc", False,
+              ("\n⚙️ 即将启动服务管理器", "📋 是否确认启动服务管理器？")),
+    "注册表编辑器": ("注册表编辑器", "regedit", False,
+               ("\n⚠️  即将启动注册表编辑器", "📋 注册表编辑器是高级系统工具，错误操作可能导致系统问题",
+                "📋 是否确认启动注册表编辑器？")),
+    "系统配置": ("系统配置", "msconfig", False,
+             ("\n⚙️ 即将启动系统配置", "📋 是否确认启动系统配置工具？")),
+    "命令提示符": ("命令提示符", "cmd", True, None),
+    "powershell": ("PowerShell", "powershell", True, None),
+    "系统信息": ("系统信息", "msinfo32", False, None),
+    "磁盘管理": ("磁盘管理", "diskmgmt.msc", False,
+             ("\n💽 即将启动磁盘管理", "📋 是否确认启动磁盘管理？")),
+    "事件查看器": ("事件查看器", "eventvwr.msc", False,
+              ("\n📋 即将启动事件查看器", "📋 是否确认启动事件查看器？")),
+    "性能监视器": ("性能监视器", "perfmon.msc", False, None),
+    "资源监视器": ("资源监视器", "resmon", False, None),
+    "控制面板": ("控制面板", "control", False, None),
+    "windows设置": ("Windows设置", "ms-settings:", False, None),
+}
+
+# 静音键的虚拟键码，以及keybd_event表示松开按键的标志
+_VK_VOLUME_MUTE = 0xAD
+_KEYEVENTF_KEYUP = 0x2
+
+# 快捷方式文件后缀（均为4个字符）
+_SHORTCUT_SUFFIXES = ('.lnk', '.url')
+
+# 应用名关键词匹配时去掉的常见词
+_APP_NAME_NOISE_RE = re.compile(r'ai|软件|应用|文件夹|服务站')
+
+# 文件名关键词匹配时去掉的常见词
+_FILE_NAME_NOISE_RE = re.compile(r'应用|软件|程序|工具')
+
+def _strip_noise_words(noise_re, name: str) -> str:
+    """反复去掉名称中的常见词直到不再变化（去掉一个词后可能拼出新的常见词，如"软ai件"）"""
+    while True:
+        name, count = noise_re.subn('', name)
+        if not count:
+            return name.strip()
+
+def _strip_app_keywords(name: str) -> str:
+    """去掉应用名中的常见词，提取核心关键词"""
+    return _strip_noise_words(_APP_NAME_NOISE_RE, name)
+
+def _strip_file_keywords(name: str) -> str:
+    """去掉文件名中的常见词，提取核心关键词"""
+    return _strip_noise_words(_FILE_NAME_NOISE_RE, name)
+
+def _resolve_path(path: str, cwd: str) -> str:
+    """把~开头或相对路径转为绝对路径，cwd由调用方取一次后在多个路径间复用"""
+    if path.startswith('~'):
+        if path == '~' or path[1] in (os.sep, os.altsep):
+            return _HOME_DIR + path[1:]
+        return os.path.expanduser(path)
+    if os.path.isabs(path):
+        return path
+    return os.path.normpath(os.path.join(cwd, path))
+
+def _write_text_file(path: str, content: str, encoding: str) -> int:
+    """按文本模式的换行规则写入文件，返回写入的字节数（无需写完后再stat获取大小）"""
+    data = content.replace('\n', os.linesep).encode(encoding)
+    with open(path, 'wb') as f:
+        f.write(data)
+    return len(data)
+
+def _stat_or_none(path: str) -> Optional[os.stat_result]:
+    """返回路径的stat结果，路径不存在或无法访问时返回None"""
+    try:
+        return os.stat(path)
+    except (OSError, ValueError):
+        return None
+
+@functools.lru_cache(maxsize=None)
+def _platform_info() -> tuple:
+    """返回 (操作系统, 系统版本, 处理器, Python版本)；这些信息在运行期间不变，
+    首次查询后缓存（较新的Python在Windows上获取处理器名称需要查询WMI）"""
+    return platform.system(), platform.release(), platform.processor(), platform.python_version()
 
 class OllamaClient:
     """Ollama客户端，用于与本地Ollama服务通信"""
     
     def __init__(self, base_url: str = "http://localhost:11434"):
         self.base_url = base_url
+        # 复用同一个会话，保持与Ollama服务的长连接，避免每次请求重新建立TCP连接
+        self.session = requests.Session()
+        self.session.headers.update({"Content-Type": "application/json"})
+        adapter = HTTPAdapter(pool_connections=2, pool_maxsize=4)
+        self.session.mount("http://", adapter)
+        self.session.mount("https://", adapter)
+        # 最近一次chat/chat_stream请求是否失败（失败时返回或产出的是错误信息，而不是模型回复）
+        self.last_request_failed = False
+    
+    def close(self):
+        """关闭会话，释放连接池中的连接"""
+        self.session.close()
         
     def list_models(self) -> List[Dict]:
         """获取已安装的模型列表"""
         try:
-            response = requests.get(f"{self.base_url}/api/tags")
+            response = self.session.get(f"{self.base_url}/api/tags")
             if response.status_code == 200:
-                return response.json().get('models', [])
+                return _json_loads(response.content).get('models', [])
             else:
                 return []
         except Exception as e:
             print(f"获取模型列表失败: {e}")
             return []
     
-    def chat(self, model: str, messages: List[Dict], system_prompt: str = "") -> str:
-        """与指定模型进行对话（支持多轮对话）"""
+    def chat(self, model: str, messages: List[Dict], system_prompt: str = "", options: Optional[Dict] = None,
+             retries: int = 0) -> str:
+        """与指定模型进行对话（支持多轮对话），options为传给Ollama的生成参数，
+        retries为连接失败或超时时的重试次数（指数退避），其他错误不重试"""
+        self.last_request_failed = False
         try:
             # 构建消息列表
             chat_messages = []
@@ -987,19 +345,33 @@ class OllamaClient:
             payload = {
                 "model": model,
                 "messages": chat_messages,
-                "stream": False
+                "stream": False,
+                "keep_alive": _OLLAMA_KEEP_ALIVE
             }
+            if options:
+                payload["options"] = options
+            data = _json_dumps(payload)
             
-            response = requests.post(f"{self.base_url}/api/chat", json=payload)
+            for attempt in range(retries + 1):
+                try:
+                    response = self.session.post(f"{self.base_url}/api/chat", data=data)
+                    break
+                except (requests.ConnectionError, requests.Timeout):
+                    if attempt == retries:
+                        raise
+                    time.sleep(0.5 * 2 ** attempt)
             if response.status_code == 200:
-                return response.json()['message']['content']
+                return _json_loads(response.content)['message']['content']
             else:
+                self.last_request_failed = True
                 return f"请求失败: {response.status_code}"
         except Exception as e:
+            self.last_request_failed = True
             return f"对话失败: {e}"
     
     def chat_stream(self, model: str, messages: List[Dict], system_prompt: str = ""):
-        """与指定模型进行流式对话（支持多轮对话）"""
+        """与指定模型进行流式对话（支持多轮对话）；出错时产出错误信息并把last_request_failed置为True"""
+        self.last_request_failed = False
         try:
             # 构建消息列表
             chat_messages = []
@@ -1010,93 +382,252 @@ class OllamaClient:
             payload = {
                 "model": model,
                 "messages": chat_messages,
-                "stream": True
+                "stream": True,
+                "keep_alive": _OLLAMA_KEEP_ALIVE
             }
             
-            response = requests.post(f"{self.base_url}/api/chat", json=payload, stream=True)
-            if response.status_code == 200:
-                full_response = ""
-                for line in response.iter_lines():
-                    if line:
+            # 使用with确保流结束或中途停止时连接都能归还连接池
+            with self.session.post(f"{self.base_url}/api/chat", data=_json_dumps(payload), stream=True) as response:
+                if response.status_code == 200:
+                    response_parts = []
+                    # Ollama以分块传输逐行返回NDJSON，使用较大的读取块减少小块读取和拼接次数；
+                    # 直接按换行切分原始字节块，省去iter_lines的逐块splitlines和额外拷贝；
+                    # orjson/json均可直接解析UTF-8字节串，无需先decode
+                    for line in _iter_ndjson_lines(response.iter_content(chunk_size=_STREAM_CHUNK_SIZE)):
                         try:
-                            data = json.loads(line.decode('utf-8'))
+                            data = _json_loads(line)
                             if 'message' in data and 'content' in data['message']:
                                 content = data['message']['content']
-                                full_response += content
+                                response_parts.append(content)
                                 yield content
-                            if data.get('done', False):
-                                break
+                            # 收到done后服务端随即结束分块流，这里不提前break而是读到流末尾，
+                            # 连接被完整读取后才能放回连接池复用
                         except json.JSONDecodeError:
                             continue
-                return full_response
-            else:
-                yield f"请求失败: {response.status_code}"
-                return f"请求失败: {response.status_code}"
+                    return "".join(response_parts)
+                else:
+                    self.last_request_failed = True
+                    yield f"请求失败: {response.status_code}"
+                    return f"请求失败: {response.status_code}"
         except Exception as e:
+            self.last_request_failed = True
             yield f"对话失败: {e}"
             return f"对话失败: {e}"
 
 class TaskExecutor:
     """任务执行器，用于执行AI识别出的特定任务"""
-    
+
+    # 快捷方式扫描结果缓存，以及扫描时记录的各目录修改时间（用于判断缓存是否失效）
+    _shortcuts_cache: Optional[Dict[str, str]] = None
+    _shortcuts_dir_mtimes: Dict[str, Optional[float]] = {}
+    # 缓存中属于文件夹的条目路径（扫描时由DirEntry得出，匹配时无需再调用os.path.isdir）
+    _shortcuts_dir_paths: frozenset = frozenset()
+    # 每次重新扫描后递增，作为应用名解析结果缓存的失效标记
+    _shortcuts_generation = 0
+    # 各搜索路径上次的扫描结果：搜索路径 -> (快捷方式映射, 目录mtime映射, 文件夹条目路径集合)，
+    # 重新扫描时只处理有变化的搜索路径
+    _shortcuts_root_parts: Dict[str, tuple] = {}
+
+    # find_best_match使用的匹配索引，及其对应的快捷方式映射（按对象身份判断是否需要重建）
+    _shortcut_index: tuple = ({}, {}, [], [])
+    _shortcut_index_source: Optional[Dict[str, str]] = None
+
+    # WiFi开关时依次尝试的网络接口名称，以及上次成功切换的接口（之后优先尝试）
+    _WIFI_INTERFACES = ("Wi-Fi", "WLAN", "无线网络连接", "Wireless Network Connection")
+    _wifi_interface: Optional[str] = None
+
+    # 本轮任务的"全部确认"状态：None表示不在多任务回复中，False表示可以选择全部确认，True表示已全部确认
+    _confirm_all: Optional[bool] = None
+
+    # 默认播放设备的音量控制接口（安装pycaw时首次调节音量或静音时获取）
+    _endpoint_volume = None
+
+    # 递归扫描开始菜单时直接跳过的子目录（小写比较），避免进入卸载程序、帮助文档等无用分支
+    _PRUNE_DIRS = frozenset({"uninstall", "卸载", "help", "帮助"})
+
+    # list_directory_files的结果缓存：目录路径 -> (目录mtime_ns, 名称到路径的映射)
+    _dir_listing_cache: Dict[str, tuple] = {}
+
+    # find_file_in_directory使用的匹配索引，及其对应的目录文件映射（按对象身份判断是否需要重建）
+    _dir_index: tuple = ([], {}, {}, {})
+    _dir_index_source: Optional[Dict[str, str]] = None
+
     @staticmethod
     def get_all_shortcuts() -> Dict[str, str]:
-        """获取所有可用的快捷方式和文件夹"""
+        """获取所有可用的快捷方式和文件夹（目录未变化时直接返回缓存结果，调用方不应修改返回的映射）"""
+        cache = TaskExecutor._shortcuts_cache
+        if cache is not None and not TaskExecutor._shortcuts_dirs_changed():
+            return cache
+
+        shortcuts, dir_mtimes, dir_paths = TaskExecutor._scan_shortcuts()
+        TaskExecutor._shortcuts_cache = shortcuts
+        TaskExecutor._shortcuts_dir_mtimes = dir_mtimes
+        TaskExecutor._shortcuts_dir_paths = frozenset(dir_paths)
+        TaskExecutor._shortcuts_generation += 1
+        return shortcuts
+
+    @staticmethod
+    def _is_shortcut_dir(path: str, shortcuts: Dict[str, str]) -> bool:
+        """判断快捷方式条目是否为文件夹，对缓存的扫描结果直接使用扫描时记录的类型"""
+        if shortcuts is TaskExecutor._shortcuts_cache:
+            return path in TaskExecutor._shortcuts_dir_paths
+        return os.path.isdir(path)
+
+    @staticmethod
+    def _shortcuts_dirs_changed() -> bool:
+        """检查上次扫描过的目录是否有增删改（目录的mtime会随其直接子项的变化而更新）"""
+        return TaskExecutor._dir_mtimes_changed(TaskExecutor._shortcuts_dir_mtimes)
+
+    @staticmethod
+    def _dir_mtimes_changed(dir_mtimes: Dict[str, Optional[float]]) -> bool:
+        """检查给定目录的mtime是否与记录的不同（目录不存在或记录为None也算变化）"""
+        for dir_path, mtime in dir_mtimes.items():
+            try:
+                if os.stat(dir_path).st_mtime != mtime:
+                    return True
+            except OSError:
+                return True
+        return False
+
+    @staticmethod
+    def _scan_shortcuts() -> tuple:
+        """扫描桌面和开始菜单，返回 (快捷方式映射, 已扫描目录的mtime映射, 文件夹条目路径集合)"""
         shortcuts = {}
+        dir_mtimes = {}
+        dir_paths = set()
         if sys.platform == "win32":
-            # 获取用户桌面路径
-            user_desktop_paths = []
-            home_dir = os.path.expanduser("~")
-            
-            # 尝试多种桌面路径
-            possible_desktop_names = ["Desktop", "桌面", "desktop"]
-            for desktop_name in possible_desktop_names:
-                desktop_path = os.path.join(home_dir, desktop_name)
-                if os.path.exists(desktop_path):
-                    user_desktop_paths.append(desktop_path)
-            
-            # 公共桌面路径
-            public_desktop_paths = []
-            if os.environ.get("PUBLIC"):
-                public_desktop_paths.append(os.path.join(os.environ.get("PUBLIC"), "Desktop"))
-            if os.environ.get("ALLUSERSPROFILE"):
-                public_desktop_paths.append(os.path.join(os.environ.get("ALLUSERSPROFILE"), "Desktop"))
-            
-            # 开始菜单路径
-            start_menu_paths = []
-            if os.environ.get("APPDATA"):
-                start_menu_paths.append(os.path.join(os.environ.get("APPDATA"), "Microsoft", "Windows", "Start Menu", "Programs"))
-            if os.environ.get("PROGRAMDATA"):
-                start_menu_paths.append(os.path.join(os.environ.get("PROGRAMDATA"), "Microsoft", "Windows", "Start Menu", "Programs"))
+            # 获取用户桌面路径（尝试多种桌面路径）
+            user_desktop_paths = [path for path in _USER_DESKTOP_CANDIDATES if os.path.exists(path)]
+            public_desktop_paths = _PUBLIC_DESKTOP_PATHS
+            start_menu_paths = _START_MENU_PATHS
             
             # 合并所有搜索路径
             search_paths = user_desktop_paths + public_desktop_paths + start_menu_paths
-            
-            for search_path in search_paths:
-                if os.path.exists(search_path):
-                    try:
-                        # 如果是桌面路径，也包含文件夹
-                        is_desktop = any(desktop_name in search_path for desktop_name in ["Desktop", "桌面", "desktop"])
-                        
-                        for root, dirs, files in os.walk(search_path):
-                            # 处理文件（快捷方式）
-                            for file in files:
-                                if file.lower().endswith(('.lnk', '.url')):
-                                    app_name = file.replace('.lnk', '').replace('.url', '')
-                                    full_path = os.path.join(root, file)
-                                    shortcuts[app_name.lower()] = full_path
-                            
-                            # 如果是桌面路径，也添加文件夹
-                            if is_desktop and root == search_path:  # 只处理桌面根目录的文件夹
-                                for dir_name in dirs:
-                                    if not dir_name.startswith('.'):  # 忽略隐藏文件夹
-                                        full_path = os.path.join(root, dir_name)
-                                        shortcuts[dir_name.lower()] = full_path
-                    except Exception as e:
-                        print(f"扫描路径 {search_path} 时出错: {e}")
-                        continue
-        return shortcuts
+            desktop_roots = set(user_desktop_paths + public_desktop_paths)
+            
+            # 同一目录可能以不同写法出现（如Desktop与desktop、目录联接），按真实路径去重后只扫描一次；
+            # 重复时保留最后出现的位置，合并时的覆盖顺序与重复扫描时相同
+            unique_paths = {}
+            for path in search_paths:
+                if os.path.exists(path):
+                    real_key = os.path.normcase(os.path.realpath(path))
+                    unique_paths.pop(real_key, None)
+                    unique_paths[real_key] = path
+            existing_paths = list(unique_paths.values())
+            # 目录均未变化的搜索路径直接沿用上次的结果，只重新扫描有变化的
+            old_parts = TaskExecutor._shortcuts_root_parts
+            parts = {}
+            stale_paths = []
+            for path in existing_paths:
+                part = old_parts.get(path)
+                # 扫描出错的搜索路径没有记录mtime，这样的结果不能复用
+                if part is not None and part[1] and not TaskExecutor._dir_mtimes_changed(part[1]):
+                    parts[path] = part
+                else:
+                    stale_paths.append(path)
+            if stale_paths:
+                # 各搜索路径互不相关且以文件系统IO为主，并行扫描
+                with ThreadPoolExecutor(max_workers=len(stale_paths)) as executor:
+                    rescanned = executor.map(TaskExecutor._scan_shortcut_root, stale_paths,
+                                             [path in desktop_roots for path in stale_paths])
+                    parts.update(zip(stale_paths, rescanned))
+            TaskExecutor._shortcuts_root_parts = parts
+            
+            # 按搜索路径的原顺序合并（后扫描的同名项覆盖先前的）
+            for path in existing_paths:
+                part_shortcuts, part_mtimes, part_dir_paths = parts[path]
+                shortcuts.update(part_shortcuts)
+                dir_mtimes.update(part_mtimes)
+                dir_paths.update(part_dir_paths)
+                if not part_mtimes:
+                    # 扫描出错的搜索路径记为None，下次获取时必然视为已变化，重新扫描该路径
+                    dir_mtimes[path] = None
+        return shortcuts, dir_mtimes, dir_paths
     
+    @staticmethod
+    def _scan_shortcut_root(search_path: str, is_desktop: bool) -> tuple:
+        """扫描单个搜索路径：桌面只扫描根目录（包含文件夹），开始菜单递归扫描快捷方式"""
+        shortcuts = {}
+        dir_mtimes = {}
+        dir_paths = set()
+        try:
+            # 扫描前取mtime，扫描期间目录有变化时下次仍能发现；扫描成功后才记录，出错的结果不会被复用
+            root_mtime = os.stat(search_path).st_mtime
+            TaskExecutor._scan_shortcut_dir(search_path, not is_desktop, is_desktop,
+                                            shortcuts, dir_mtimes, dir_paths)
+            dir_mtimes[search_path] = root_mtime
+        except Exception as e:
+            print(f"扫描路径 {search_path} 时出错: {e}")
+            return {}, {}, set()
+        return shortcuts, dir_mtimes, dir_paths
+    
+    @staticmethod
+    def _scan_shortcut_dir(root: str, recurse: bool, include_dirs: bool,
+                           shortcuts: Dict[str, str], dir_mtimes: Dict[str, float], dir_paths: set):
+        """用os.scandir扫描单个目录中的快捷方式，DirEntry自带类型信息，无需逐项再stat"""
+        subdirs = []
+        # 循环中反复使用的常量和方法先绑定为局部变量
+        suffixes = _SHORTCUT_SUFFIXES
+        prune_dirs = TaskExecutor._PRUNE_DIRS
+        add_dir_path = dir_paths.add
+        with os.scandir(root) as it:
+            for entry in it:
+                name = entry.name
+                name_lower = name.lower()
+                if entry.is_file(follow_symlinks=False):
+                    # 处理文件（快捷方式），两种后缀都是4个字符，直接切掉
+                    if name_lower.endswith(suffixes):
+                        shortcuts[name_lower[:-4]] = entry.path
+                elif entry.is_dir(follow_symlinks=False):
+                    if name.startswith('.'):  # 忽略隐藏文件夹
+                        continue
+                    # 如果是桌面路径，也添加文件夹
+                    if include_dirs:
+                        shortcuts[name_lower] = entry.path
+                        add_dir_path(entry.path)
+                    if recurse and name_lower not in prune_dirs:
+                        subdirs.append(entry)
+
+        for entry in subdirs:
+            try:
+                dir_mtimes[entry.path] = entry.stat(follow_symlinks=False).st_mtime
+                TaskExecutor._scan_shortcut_dir(entry.path, recurse, include_dirs,
+                                                shortcuts, dir_mtimes, dir_paths)
+            except OSError:
+                continue
+
+    @staticmethod
+    def _build_shortcut_trie(shortcuts: Dict[str, str]) -> Dict:
+        """以快捷方式名称构建字符前缀树，节点中 "" 键保存以该节点结尾的完整名称"""
+        trie = {}
+        for shortcut_name in shortcuts:
+            node = trie
+            for ch in shortcut_name:
+                node = node.setdefault(ch, {})
+            node[""] = shortcut_name
+        return trie
+
+    @staticmethod
+    def _build_bigram_index(shortcuts: Dict[str, str]) -> Dict[str, tuple]:
+        """建立 双字符片段 -> (序号, 快捷方式名称) 索引，只保留最先出现的快捷方式"""
+        bigrams = {}
+        for position, shortcut_name in enumerate(shortcuts):
+            for i in range(len(shortcut_name) - 1):
+                bigrams.setdefault(shortcut_name[i:i + 2], (position, shortcut_name))
+        return bigrams
+
+    @staticmethod
+    def _get_shortcut_index(shortcuts: Dict[str, str]) -> tuple:
+        """获取快捷方式的 (前缀树, 双字符索引, 按顺序排列的核心关键词列表, 按顺序排列的字符集合列表)，
+        对同一个快捷方式映射只构建一次"""
+        if TaskExecutor._shortcut_index_source is not shortcuts:
+            TaskExecutor._shortcut_index = (TaskExecutor._build_shortcut_trie(shortcuts),
+                                            TaskExecutor._build_bigram_index(shortcuts),
+                                            [_strip_app_keywords(name) for name in shortcuts],
+                                            [frozenset(name) for name in shortcuts])
+            TaskExecutor._shortcut_index_source = shortcuts
+        return TaskExecutor._shortcut_index
+
     @staticmethod
     def find_best_match(app_name: str, shortcuts: Dict[str, str]) -> tuple:
         """找到最佳匹配的快捷方式或文件夹"""
@@ -1106,201 +637,200 @@ class TaskExecutor:
         if app_name_lower in shortcuts:
             return shortcuts[app_name_lower], "完全匹配"
         
+        trie, bigrams, stripped_names, name_chars = TaskExecutor._get_shortcut_index(shortcuts)
+        app_keywords = _strip_app_keywords(app_name_lower)
+        
+        # 从应用名的每个位置出发沿前缀树向下走，一次性找出所有包含在应用名中的快捷方式名
+        contained_names = set()
+        for i in range(len(app_name_lower)):
+            node = trie
+            for ch in app_name_lower[i:]:
+                node = node.get(ch)
+                if node is None:
+                    break
+                if "" in node:
+                    contained_names.add(node[""])
+        
         # 2. 双向包含匹配（应用名在快捷方式名中，或快捷方式名在应用名中）
+        # 开头匹配是包含匹配的特例，已由这两种情况覆盖
+        # 只记录匹配方式，条目类型（文件夹/应用）在选出最佳匹配后再判断一次
         best_match = None
         best_score = 0
-        best_type = ""
+        best_name = ""
+        best_kind = ""
         
-        for shortcut_name, path in shortcuts.items():
+        for (shortcut_name, path), shortcut_keywords in zip(shortcuts.items(), stripped_names):
             score = 0
-            match_type = ""
+            match_kind = ""
             
             # 应用名包含在快捷方式名中
             if app_name_lower in shortcut_name:
                 score = len(app_name_lower) / len(shortcut_name)
-                item_type = "文件夹" if os.path.isdir(path) else "应用"
-                match_type = f"应用名匹配: {shortcut_name} ({item_type})"
+                match_kind = "应用名匹配"
             
             # 快捷方式名包含在应用名中（处理"豆包AI"匹配"豆包"的情况）
-            elif shortcut_name in app_name_lower:
+            elif shortcut_name in contained_names:
                 score = len(shortcut_name) / len(app_name_lower)
-                item_type = "文件夹" if os.path.isdir(path) else "应用"
-                match_type = f"快捷方式匹配: {shortcut_name} ({item_type})"
+                match_kind = "快捷方式匹配"
             
-            # 开头匹配
-            elif shortcut_name.startswith(app_name_lower) or app_name_lower.startswith(shortcut_name):
-                if shortcut_name.startswith(app_name_lower):
-                    score = len(app_name_lower) / len(shortcut_name)
-                else:
-                    score = len(shortcut_name) / len(app_name_lower)
-                item_type = "文件夹" if os.path.isdir(path) else "应用"
-                match_type = f"开头匹配: {shortcut_name} ({item_type})"
-            
-            # 关键词匹配（去掉常见后缀如AI、软件等）
+            # 关键词匹配（去掉常见后缀如AI、软件等，核心关键词已预先提取）
             else:
-                # 提取核心关键词
-                app_keywords = app_name_lower.replace('ai', '').replace('软件', '').replace('应用', '').replace('文件夹', '').replace('服务站', '').strip()
-                shortcut_keywords = shortcut_name.replace('ai', '').replace('软件', '').replace('应用', '').replace('文件夹', '').replace('服务站', '').strip()
-                
                 if app_keywords and shortcut_keywords:
                     if app_keywords in shortcut_keywords or shortcut_keywords in app_keywords:
                         score = min(len(app_keywords), len(shortcut_keywords)) / max(len(app_keywords), len(shortcut_keywords))
-                        item_type = "文件夹" if os.path.isdir(path) else "应用"
-                        match_type = f"关键词匹配: {shortcut_name} ({item_type})"
+                        match_kind = "关键词匹配"
             
             # 更新最佳匹配
             if score > best_score:
                 best_score = score
                 best_match = path
-                best_type = match_type
+                best_name = shortcut_name
+                best_kind = match_kind
+                # 满分（如核心关键词完全相同）不可能被后续项超过，直接结束扫描
+                if best_score >= 1.0:
+                    break
         
         # 如果找到了匹配项且分数足够高
         if best_match and best_score >= 0.2:  # 进一步降低阈值到20%，提高匹配成功率
-            return best_match, best_type
+            item_type = "文件夹" if TaskExecutor._is_shortcut_dir(best_match, shortcuts) else "应用"
+            return best_match, f"{best_kind}: {best_name} ({item_type})"
         
-        # 3. 模糊匹配（字符级别匹配）
-        for shortcut_name, path in shortcuts.items():
+        # 3. 模糊匹配（字符级别匹配），快捷方式名的字符集合已在索引中预先计算
+        app_chars = set(app_name_lower)
+        for (shortcut_name, path), shortcut_chars in zip(shortcuts.items(), name_chars):
             # 计算共同字符数
-            common_chars = set(app_name_lower) & set(shortcut_name)
+            common_chars = app_chars & shortcut_chars
             if common_chars:
-                match_ratio = len(common_chars) / max(len(set(app_name_lower)), len(set(shortcut_name)))
+                match_ratio = len(common_chars) / max(len(app_chars), len(shortcut_chars))
                 if match_ratio >= 0.4:  # 降低字符匹配阈值到40%
-                    item_type = "文件夹" if os.path.isdir(path) else "应用"
+                    item_type = "文件夹" if TaskExecutor._is_shortcut_dir(path, shortcuts) else "应用"
                     return path, f"字符匹配: {shortcut_name} ({item_type})"
         
         # 4. 部分匹配（针对中文名称的特殊处理）
-        for shortcut_name, path in shortcuts.items():
-            # 检查是否有任何连续的字符匹配
-            for i in range(len(app_name_lower)):
-                for j in range(i + 2, len(app_name_lower) + 1):  # 至少2个字符
-                    substring = app_name_lower[i:j]
-                    if len(substring) >= 2 and substring in shortcut_name:
-                        item_type = "文件夹" if os.path.isdir(path) else "应用"
-                        return path, f"部分匹配: {shortcut_name} ({item_type})"
+        # 任意长度≥2的公共子串必然包含一个公共的双字符片段，取最先出现的快捷方式
+        hits = [bigrams[app_name_lower[i:i + 2]] for i in range(len(app_name_lower) - 1)
+                if app_name_lower[i:i + 2] in bigrams]
+        if hits:
+            _, shortcut_name = min(hits)
+            path = shortcuts[shortcut_name]
+            item_type = "文件夹" if TaskExecutor._is_shortcut_dir(path, shortcuts) else "应用"
+            return path, f"部分匹配: {shortcut_name} ({item_type})"
         
         return None, None
     
+    @staticmethod
+    @functools.lru_cache(maxsize=256)
+    def _resolve_app(app_name_lower: str, generation: int) -> tuple:
+        """在当前快捷方式缓存中解析应用名，同一次扫描结果下重复请求同一应用时直接复用匹配结果"""
+        return TaskExecutor.find_best_match(app_name_lower, TaskExecutor._shortcuts_cache)
+
+    @staticmethod
+    def open_applications(app_names: List[str]) -> List[str]:
+        """打开多个应用程序或文件夹，返回按app_names顺序排列的结果"""
+        if len(app_names) <= 1:
+            return [TaskExecutor.open_application(app_name) for app_name in app_names]
+        # 名称解析会读写快捷方式缓存和匹配索引等类属性，统一在当前线程完成；
+        # 只把互不相关的启动操作放到线程池中并行执行
+        launches = [TaskExecutor._prepare_open_application(app_name) for app_name in app_names]
+        with ThreadPoolExecutor(max_workers=min(len(launches), 8)) as executor:
+            futures = [executor.submit(launch) for launch in launches]
+            return [future.result() for future in futures]
+
     @staticmethod
     def open_application(app_name: str) -> str:
         """打开指定应用程序或文件夹"""
+        return TaskExecutor._prepare_open_application(app_name)()
+
+    @staticmethod
+    def _prepare_open_application(app_name: str):
+        """解析要打开的应用程序或文件夹，返回执行启动并返回结果信息的无参函数（无法打开时直接返回错误信息）"""
         try:
             if sys.platform == "win32":
                 # Windows系统
-                common_apps = {
-                    "记事本": "notepad",
-                    "计算器": "calc",
-                    "画图": "mspaint",
-                    "浏览器": "start chrome",
-                    "文件管理器": "explorer",
-                    "资源管理器": "explorer",
-                    "任务管理器": "taskmgr",
-                    "控制面板": "control",
-                    "命令提示符": "cmd",
-                    "设置": "ms-settings:",
-                    "系统设置": "ms-settings:",
-                    "注册表编辑器": "regedit",
-                    "服务管理器": "services.msc",
-                    "设备管理器": "devmgmt.msc",
-                    "磁盘管理": "diskmgmt.msc",
-                    "事件查看器": "eventvwr.msc",
-                    "组策略编辑器": "gpedit.msc",
-                    "性能监视器": "perfmon.msc",
-                    "远程桌面": "mstsc",
-                    "PowerShell": "powershell",
-                    "资源监视器": "resmon",
-                    "防火墙": "firewall.cpl",
-                    "网络连接": "ncpa.cpl",
-                    "声音设置": "mmsys.cpl",
-                    "电源选项": "powercfg.cpl",
-                    "系统属性": "sysdm.cpl",
-                    "时间和日期": "timedate.cpl",
-                    "用户账户": "netplwiz",
-                    # 添加系统特殊项目
-                    "计算机": "explorer.exe ::{20D04FE0-3AEA-1069-A2D8-08002B30309D}",
-                    "我的电脑": "explorer.exe ::{20D04FE0-3AEA-1069-A2D8-08002B30309D}",
-                    "此电脑": "explorer.exe ::{20D04FE0-3AEA-1069-A2D8-08002B30309D}",
-                    "回收站": "explorer.exe ::{645FF040-5081-101B-9F08-00AA002F954E}",
-                    "网络": "explorer.exe ::{F02C1A0D-BE21-4350-88B0-7367FC96EF3C}",
-                    "网上邻居": "explorer.exe ::{F02C1A0D-BE21-4350-88B0-7367FC96EF3C}",
-                    "桌面": "explorer.exe shell:desktop",
-                    "文档": "explorer.exe shell:personal",
-                    "下载": "explorer.exe shell:downloads",
-                    "图片": "explorer.exe shell:mypictures",
-                    "音乐": "explorer.exe shell:mymusic",
-                    "视频": "explorer.exe shell:myvideo"
-                }
                 
                 # 首先检查是否为系统内置应用
                 app_name_lower = app_name.lower()
-                matched_key = None
+                common_apps_lower = _COMMON_APPS_LOWER
                 
                 # 精确匹配
-                for key in common_apps:
-                    if app_name == key or app_name_lower == key.lower():
-                        matched_key = key
-                        break
+                matched = common_apps_lower.get(app_name_lower)
                 
                 # 如果没有精确匹配，尝试模糊匹配
-                if not matched_key:
-                    for key in common_apps:
-                        if app_name_lower in key.lower() or key.lower() in app_name_lower:
-                            matched_key = key
-                            break
+                if not matched:
+                    matched = next((item for key_lower, item in common_apps_lower.items()
+                                    if app_name_lower in key_lower or key_lower in app_name_lower), None)
                 
-                if matched_key:
-                    try:
-                        subprocess.Popen(common_apps[matched_key], shell=True)
-                        return f"✅ 已打开系统项目: {matched_key}"
-                    except Exception as e:
-                        return f"❌ 打开系统项目失败: {e}"
+                if matched:
+                    matched_key, command = matched
+                    return lambda: TaskExecutor._launch_system_item(matched_key, command)
                 
                 # 对于第三方应用和文件夹，先读取所有快捷方式和文件夹
                 print(f"🔍 正在搜索 '{app_name}' 相关的快捷方式...")
                 shortcuts = TaskExecutor.get_all_shortcuts()
                 
                 if not shortcuts:
-                    return f"❌ 未找到任何快捷方式或文件夹，请检查桌面和开始菜单是否有应用程序"
+                    message = f"❌ 未找到任何快捷方式或文件夹，请检查桌面和开始菜单是否有应用程序"
+                    return lambda: message
                 
-                # 查找最佳匹配
-                best_match_path, match_type = TaskExecutor.find_best_match(app_name, shortcuts)
+                # 查找最佳匹配（按应用名和扫描代次缓存）
+                best_match_path, match_type = TaskExecutor._resolve_app(
+                    app_name.lower().strip(), TaskExecutor._shortcuts_generation)
                 
                 if best_match_path:
-                    try:
-                        # 判断是文件夹还是快捷方式
-                        if os.path.isdir(best_match_path):
-                            # 是文件夹，用资源管理器打开
-                            subprocess.Popen(f'explorer "{best_match_path}"', shell=True)
-                            folder_name = os.path.basename(best_match_path)
-                            return f"✅ 已打开文件夹: {folder_name} ({match_type})"
-                        else:
-                            # 是快捷方式文件，直接启动
-                            os.startfile(best_match_path)
-                            shortcut_name = os.path.basename(best_match_path).replace('.lnk', '').replace('.url', '')
-                            return f"✅ 已打开应用: {shortcut_name} ({match_type})"
-                    except Exception as e:
-                        # 如果os.startfile失败，尝试使用subprocess
-                        try:
-                            if os.path.isdir(best_match_path):
-                                subprocess.Popen(f'explorer "{best_match_path}"', shell=True)
-                                folder_name = os.path.basename(best_match_path)
-                                return f"✅ 已打开文件夹: {folder_name} ({match_type})"
-                            else:
-                                subprocess.Popen(f'start "" "{best_match_path}"', shell=True)
-                                shortcut_name = os.path.basename(best_match_path).replace('.lnk', '').replace('.url', '')
-                                return f"✅ 已打开应用: {shortcut_name} ({match_type})"
-                        except Exception as e2:
-                            return f"❌ 找到匹配项但启动失败: {best_match_path}\n错误信息: {e2}"
+                    # 判断是文件夹还是快捷方式
+                    is_dir = TaskExecutor._is_shortcut_dir(best_match_path, shortcuts)
+                    return lambda: TaskExecutor._launch_shortcut(best_match_path, is_dir, match_type)
                 else:
                     # 显示可用的快捷方式和文件夹供用户参考
                     available_items = list(shortcuts.keys())[:10]  # 显示前10个
                     items_list = "、".join(available_items)
-                    return f"❌ 未找到与 '{app_name}' 匹配的应用程序或文件夹\n💡 可用的项目包括: {items_list}{'...' if len(shortcuts) > 10 else ''}"
+                    message = f"❌ 未找到与 '{app_name}' 匹配的应用程序或文件夹\n💡 可用的项目包括: {items_list}{'...' if len(shortcuts) > 10 else ''}"
+                    return lambda: message
                     
             else:
-                return f"❌ 此功能目前仅支持Windows系统"
+                message = f"❌ 此功能目前仅支持Windows系统"
+                return lambda: message
                 
         except Exception as e:
-            return f"❌ 打开应用失败: {e}"
+            message = f"❌ 打开应用失败: {e}"
+            return lambda: message
+
+    @staticmethod
+    def _launch_system_item(matched_key: str, command: str) -> str:
+        """启动系统内置应用或工具"""
+        try:
+            subprocess.Popen(command, shell=True)
+            return f"✅ 已打开系统项目: {matched_key}"
+        except Exception as e:
+            return f"❌ 打开系统项目失败: {e}"
+
+    @staticmethod
+    def _launch_shortcut(best_match_path: str, is_dir: bool, match_type: str) -> str:
+        """打开匹配到的快捷方式或文件夹"""
+        try:
+            if is_dir:
+                # 是文件夹，用资源管理器打开
+                subprocess.Popen(["explorer", best_match_path])
+                folder_name = os.path.basename(best_match_path)
+                return f"✅ 已打开文件夹: {folder_name} ({match_type})"
+            else:
+                # 是快捷方式文件，直接启动
+                os.startfile(best_match_path)
+                shortcut_name = os.path.splitext(os.path.basename(best_match_path))[0]
+                return f"✅ 已打开应用: {shortcut_name} ({match_type})"
+        except Exception as e:
+            # 如果os.startfile失败，尝试使用subprocess
+            try:
+                if is_dir:
+                    subprocess.Popen(["explorer", best_match_path])
+                    folder_name = os.path.basename(best_match_path)
+                    return f"✅ 已打开文件夹: {folder_name} ({match_type})"
+                else:
+                    subprocess.Popen(f'start "" "{best_match_path}"', shell=True)
+                    shortcut_name = os.path.splitext(os.path.basename(best_match_path))[0]
+                    return f"✅ 已打开应用: {shortcut_name} ({match_type})"
+            except Exception as e2:
+                return f"❌ 找到匹配项但启动失败: {best_match_path}\n错误信息: {e2}"
             
     @staticmethod
     def system_power_action(action: str) -> str:
@@ -1311,52 +841,47 @@ class TaskExecutor:
                 if action == "关机":
                     print(f"\n⚠️  即将执行关机操作")
                     print("📋 是否确认关机？系统将在60秒后关机。")
-                    confirm = input("请输入 (y/n): ").strip().lower()
-                    if confirm not in ['y', 'yes', '是', '确认']:
+                    if not TaskExecutor._confirm("请输入 (y/n): "):
                         return "❌ 关机操作已取消"
-                    subprocess.Popen("shutdown /s /t 60", shell=True)
+                    subprocess.Popen(["shutdown", "/s", "/t", "60"])
                     return "✅ 系统将在60秒后关机，请保存您的工作。输入'取消关机'可取消。"
                 elif action == "取消关机":
-                    subprocess.Popen("shutdown /a", shell=True)
+                    subprocess.Popen(["shutdown", "/a"])
                     return "✅ 已取消关机操作。"
                 elif action == "重启":
                     print(f"\n⚠️  即将执行重启操作")
                     print("📋 是否确认重启？系统将在60秒后重启。")
-                    confirm = input("请输入 (y/n): ").strip().lower()
-                    if confirm not in ['y', 'yes', '是', '确认']:
+                    if not TaskExecutor._confirm("请输入 (y/n): "):
                         return "❌ 重启操作已取消"
-                    subprocess.Popen("shutdown /r /t 60", shell=True)
+                    subprocess.Popen(["shutdown", "/r", "/t", "60"])
                     return "✅ 系统将在60秒后重启，请保存您的工作。输入'取消重启'可取消。"
                 elif action == "取消重启":
-                    subprocess.Popen("shutdown /a", shell=True)
+                    subprocess.Popen(["shutdown", "/a"])
                     return "✅ 已取消重启操作。"
                 elif action == "注销":
                     print(f"\n⚠️  即将执行注销操作")
                     print("📋 是否确认注销当前用户？")
-                    confirm = input("请输入 (y/n): ").strip().lower()
-                    if confirm not in ['y', 'yes', '是', '确认']:
+                    if not TaskExecutor._confirm("请输入 (y/n): "):
                         return "❌ 注销操作已取消"
-                    subprocess.Popen("shutdown /l", shell=True)
+                    subprocess.Popen(["shutdown", "/l"])
                     return "✅ 正在注销当前用户..."
                 elif action == "休眠":
                     print(f"\n⚠️  即将执行休眠操作")
                     print("📋 是否确认让系统进入休眠状态？")
-                    confirm = input("请输入 (y/n): ").strip().lower()
-                    if confirm not in ['y', 'yes', '是', '确认']:
+                    if not TaskExecutor._confirm("请输入 (y/n): "):
                         return "❌ 休眠操作已取消"
-                    subprocess.Popen("rundll32.exe powrprof.dll,SetSuspendState 0,1,0", shell=True)
+                    subprocess.Popen(["rundll32.exe", "powrprof.dll,SetSuspendState", "0,1,0"])
                     return "✅ 系统正在进入休眠状态..."
                 elif action == "睡眠":
                     print(f"\n⚠️  即将执行睡眠操作")
                     print("📋 是否确认让系统进入睡眠状态？")
-                    confirm = input("请输入 (y/n): ").strip().lower()
-                    if confirm not in ['y', 'yes', '是', '确认']:
+                    if not TaskExecutor._confirm("请输入 (y/n): "):
                         return "❌ 睡眠操作已取消"
-                    subprocess.Popen("rundll32.exe powrprof.dll,SetSuspendState 0,1,0", shell=True)
+                    subprocess.Popen(["rundll32.exe", "powrprof.dll,SetSuspendState", "0,1,0"])
                     return "✅ 系统正在进入睡眠状态..."
                 elif action == "锁定":
                     # 锁定操作相对安全，不需要确认
-                    subprocess.Popen("rundll32.exe user32.dll,LockWorkStation", shell=True)
+                    subprocess.Popen(["rundll32.exe", "user32.dll,LockWorkStation"])
                     return "✅ 已锁定计算机。"
                 else:
                     return f"❌ 不支持的系统操作: {action}"
@@ -1382,72 +907,45 @@ class TaskExecutor:
             print("   • 预读取文件")
             print("⚠️  注意: 此操作将删除临时文件，可能影响某些程序的运行状态")
             
-            confirm = input("是否确认执行清理操作？(y/n): ").strip().lower()
-            if confirm not in ['y', 'yes', '是', '确认']:
+            if not TaskExecutor._confirm("是否确认执行清理操作？(y/n): "):
                 return "❌ 清理操作已取消"
             
-            results = []
-            cleaned_size = 0
+            # 1-5. 各清理项涉及互不相关的目录，耗时主要在文件系统IO上，
+            # 放到线程池中并行执行，结果按下列顺序汇总
+            jobs = []
             
             # 1. 清理用户临时文件
-            try:
-                temp_path = os.environ.get('TEMP', '')
-                if temp_path and os.path.exists(temp_path):
-                    print("🔄 正在清理用户临时文件...")
-                    size_before = TaskExecutor._get_folder_size(temp_path)
-                    TaskExecutor._clean_folder(temp_path, keep_folder=True)
-                    size_after = TaskExecutor._get_folder_size(temp_path)
-                    cleaned = size_before - size_after
-                    cleaned_size += cleaned
-                    results.append(f"✅ 用户临时文件: 清理了 {TaskExecutor._format_size(cleaned)}")
-            except Exception as e:
-                results.append(f"⚠️ 用户临时文件清理失败: {e}")
+            temp_path = _ENV_TEMP
+            if temp_path and os.path.exists(temp_path):
+                print("🔄 正在清理用户临时文件...")
+                jobs.append((TaskExecutor._clean_junk_folder, ("用户临时文件", temp_path)))
             
             # 2. 清理Windows临时文件
-            try:
-                win_temp_path = "C:\\Windows\\Temp"
-                if os.path.exists(win_temp_path):
-                    print("🔄 正在清理Windows临时文件...")
-                    size_before = TaskExecutor._get_folder_size(win_temp_path)
-                    TaskExecutor._clean_folder(win_temp_path, keep_folder=True)
-                    size_after = TaskExecutor._get_folder_size(win_temp_path)
-                    cleaned = size_before - size_after
-                    cleaned_size += cleaned
-                    results.append(f"✅ Windows临时文件: 清理了 {TaskExecutor._format_size(cleaned)}")
-            except Exception as e:
-                results.append(f"⚠️ Windows临时文件清理失败: {e}")
+            win_temp_path = "C:\\Windows\\Temp"
+            if os.path.exists(win_temp_path):
+                print("🔄 正在清理Windows临时文件...")
+                jobs.append((TaskExecutor._clean_junk_folder, ("Windows临时文件", win_temp_path)))
             
             # 3. 清理回收站
-            try:
-                print("🔄 正在清理回收站...")
-                subprocess.run("PowerShell.exe -Command Clear-RecycleBin -Force", 
-                             shell=True, capture_output=True, text=True, timeout=30)
-                results.append("✅ 回收站: 已清空")
-            except Exception as e:
-                results.append(f"⚠️ 回收站清理失败: {e}")
+            print("🔄 正在清理回收站...")
+            jobs.append((TaskExecutor._empty_recycle_bin, ()))
             
             # 4. 清理预读取文件
-            try:
-                prefetch_path = "C:\\Windows\\Prefetch"
-                if os.path.exists(prefetch_path):
-                    print("🔄 正在清理预读取文件...")
-                    size_before = TaskExecutor._get_folder_size(prefetch_path)
-                    TaskExecutor._clean_folder(prefetch_path, keep_folder=True, file_pattern="*.pf")
-                    size_after = TaskExecutor._get_folder_size(prefetch_path)
-                    cleaned = size_before - size_after
-                    cleaned_size += cleaned
-                    results.append(f"✅ 预读取文件: 清理了 {TaskExecutor._format_size(cleaned)}")
-            except Exception as e:
-                results.append(f"⚠️ 预读取文件清理失败: {e}")
+            prefetch_path = "C:\\Windows\\Prefetch"
+            if os.path.exists(prefetch_path):
+                print("🔄 正在清理预读取文件...")
+                jobs.append((TaskExecutor._clean_junk_folder, ("预读取文件", prefetch_path, "*.pf")))
             
             # 5. 清理浏览器缓存
-            try:
-                print("🔄 正在清理浏览器缓存...")
-                browser_cleaned = TaskExecutor._clean_browser_cache()
-                cleaned_size += browser_cleaned
-                results.append(f"✅ 浏览器缓存: 清理了 {TaskExecutor._format_size(browser_cleaned)}")
-            except Exception as e:
-                results.append(f"⚠️ 浏览器缓存清理失败: {e}")
+            print("🔄 正在清理浏览器缓存...")
+            jobs.append((TaskExecutor._clean_browser_cache_job, ()))
+            
+            with ThreadPoolExecutor(max_workers=len(jobs)) as executor:
+                futures = [executor.submit(func, *args) for func, args in jobs]
+                outcomes = [future.result() for future in futures]
+            
+            results = [message for message, _ in outcomes]
+            cleaned_size = sum(cleaned for _, cleaned in outcomes)
             
             # 6. 运行磁盘清理
             try:
@@ -1462,66 +960,108 @@ class TaskExecutor:
             return '\n'.join(results) + summary
             
         except Exception as e:
-            return f"❌ 系统清理失败: {e}"
+            return f"❌ 系统清理失败: {e}"
+    
+    @staticmethod
+    def _clean_junk_folder(label: str, folder_path: str, file_pattern: str = "*") -> tuple:
+        """清理一个垃圾文件夹，返回 (结果消息, 释放的字节数)"""
+        try:
+            cleaned = TaskExecutor._clean_folder(folder_path, keep_folder=True, file_pattern=file_pattern)
+            return f"✅ {label}: 清理了 {TaskExecutor._format_size(cleaned)}", cleaned
+        except Exception as e:
+            return f"⚠️ {label}清理失败: {e}", 0
+    
+    @staticmethod
+    def _empty_recycle_bin() -> tuple:
+        """清空回收站，返回 (结果消息, 0)；直接调用shell32的SHEmptyRecycleBinW，不必启动PowerShell"""
+        try:
+            hresult = ctypes.windll.shell32.SHEmptyRecycleBinW(None, None, _SHERB_FLAGS) & 0xFFFFFFFF
+            if hresult not in _SHERB_SUCCESS_HRESULTS:
+                return f"⚠️ 回收站清理失败: HRESULT 0x{hresult:08X}", 0
+            return "✅ 回收站: 已清空", 0
+        except Exception as e:
+            return f"⚠️ 回收站清理失败: {e}", 0
+    
+    @staticmethod
+    def _clean_browser_cache_job() -> tuple:
+        """清理浏览器缓存，返回 (结果消息, 释放的字节数)"""
+        try:
+            browser_cleaned = TaskExecutor._clean_browser_cache()
+            return f"✅ 浏览器缓存: 清理了 {TaskExecutor._format_size(browser_cleaned)}", browser_cleaned
+        except Exception as e:
+            return f"⚠️ 浏览器缓存清理失败: {e}", 0
     
     @staticmethod
     def _get_folder_size(folder_path: str) -> int:
-        """获取文件夹大小（字节）"""
+        """获取文件夹大小（字节），用os.scandir遍历，文件大小取自DirEntry，无需逐个再stat"""
         total_size = 0
         try:
-            for dirpath, dirnames, filenames in os.walk(folder_path):
-                for filename in filenames:
+            with os.scandir(folder_path) as it:
+                for entry in it:
                     try:
-                        file_path = os.path.join(dirpath, filename)
-                        if os.path.exists(file_path):
-                            total_size += os.path.getsize(file_path)
-                    except (OSError, FileNotFoundError):
+                        if entry.is_file(follow_symlinks=False):
+                            total_size += entry.stat(follow_symlinks=False).st_size
+                        elif entry.is_dir(follow_symlinks=False):
+                            total_size += TaskExecutor._get_folder_size(entry.path)
+                    except OSError:
                         continue
         except Exception:
             pass
         return total_size
     
     @staticmethod
-    def _clean_folder(folder_path: str, keep_folder: bool = True, file_pattern: str = "*"):
-        """清理文件夹内容"""
+    def _clean_folder(folder_path: str, keep_folder: bool = True, file_pattern: str = "*") -> int:
+        """清理文件夹内容，返回实际删除的文件总大小（字节），删除前顺便记录大小，不必前后各统计一遍文件夹"""
+        total_deleted = 0
         try:
-            import glob
             if file_pattern == "*":
-                # 删除所有文件和子文件夹
-                for root, dirs, files in os.walk(folder_path, topdown=False):
-                    # 删除文件
-                    for file in files:
-                        try:
-                            file_path = os.path.join(root, file)
-                            os.remove(file_path)
-                        except (OSError, PermissionError):
-                            continue
-                    # 删除空文件夹
-                    for dir_name in dirs:
+                # 删除所有文件和子文件夹（不删除根文件夹）
+                total_deleted = TaskExecutor._remove_folder_contents(folder_path)
+            else:
+                # 按"*.扩展名"模式删除根目录下的特定文件，直接比较后缀（不区分大小写），无需glob构建匹配正则
+                suffix = file_pattern.lstrip("*").lower()
+                with os.scandir(folder_path) as it:
+                    for entry in it:
                         try:
-                            dir_path = os.path.join(root, dir_name)
-                            if dir_path != folder_path:  # 不删除根文件夹
-                                os.rmdir(dir_path)
+                            if entry.name.lower().endswith(suffix) and entry.is_file():
+                                file_size = entry.stat().st_size
+                                os.remove(entry.path)
+                                total_deleted += file_size
                         except (OSError, PermissionError):
                             continue
-            else:
-                # 按模式删除特定文件
-                pattern_path = os.path.join(folder_path, file_pattern)
-                for file_path in glob.glob(pattern_path):
-                    try:
-                        if os.path.isfile(file_path):
-                            os.remove(file_path)
-                    except (OSError, PermissionError):
-                        continue
         except Exception:
             pass
+        return total_deleted
+    
+    @staticmethod
+    def _remove_folder_contents(folder_path: str) -> int:
+        """用os.scandir自底向上删除文件夹中的所有文件和子文件夹，返回删除的文件总大小（字节）；
+        文件大小取自DirEntry，删除失败（如文件被占用）的项目直接跳过"""
+        total_deleted = 0
+        try:
+            with os.scandir(folder_path) as it:
+                entries = list(it)
+        except OSError:
+            return 0
+        for entry in entries:
+            try:
+                if entry.is_dir(follow_symlinks=False):
+                    total_deleted += TaskExecutor._remove_folder_contents(entry.path)
+                    os.rmdir(entry.path)
+                else:
+                    file_size = entry.stat(follow_symlinks=False).st_size
+                    os.remove(entry.path)
+                    total_deleted += file_size
+            except OSError:
+                continue
+        return total_deleted
     
     @staticmethod
     def _clean_browser_cache() -> int:
         """清理浏览器缓存"""
         total_cleaned = 0
         try:
-            user_profile = os.environ.get('USERPROFILE', '')
+            user_profile = _ENV_USERPROFILE
             if not user_profile:
                 return 0
             
@@ -1542,10 +1082,7 @@ class TaskExecutor:
             for cache_path in all_cache_paths:
                 if os.path.exists(cache_path):
                     try:
-                        size_before = TaskExecutor._get_folder_size(cache_path)
-                        TaskExecutor._clean_folder(cache_path, keep_folder=True)
-                        size_after = TaskExecutor._get_folder_size(cache_path)
-                        total_cleaned += (size_before - size_after)
+                        total_cleaned += TaskExecutor._clean_folder(cache_path, keep_folder=True)
                     except Exception:
                         continue
                         
@@ -1561,39 +1098,235 @@ class TaskExecutor:
             return "0 B"
         
         size_names = ["B", "KB", "MB", "GB", "TB"]
-        import math
-        i = int(math.floor(math.log(size_bytes, 1024)))
-        p = math.pow(1024, i)
-        s = round(size_bytes / p, 2)
+        # 每个单位相差2^10倍，由二进制位数直接得出单位，不必计算对数
+        i = min((size_bytes.bit_length() - 1) // 10, len(size_names) - 1)
+        s = round(size_bytes / (1 << (i * 10)), 2)
         return f"{s} {size_names[i]}"
     
     @staticmethod
     def get_system_info() -> str:
         """获取系统信息"""
         try:
-            import platform
+            system, release, processor, python_version = _platform_info()
             info = f"""
 📊 系统信息:
-- 操作系统: {platform.system()} {platform.release()}
-- 处理器: {platform.processor()}
-- Python版本: {platform.python_version()}
+- 操作系统: {system} {release}
+- 处理器: {processor}
+- Python版本: {python_version}
 - 当前时间: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             """
             return info.strip()
         except Exception as e:
             return f"❌ 获取系统信息失败: {e}"
     
+    @staticmethod
+    def _confirm(prompt: str) -> bool:
+        """向用户确认一项操作；一次回复包含多个任务时，可输入ya确认本轮其余全部操作"""
+        if TaskExecutor._confirm_all:
+            print("✅ 已确认本轮全部操作")
+            return True
+        offer_all = TaskExecutor._confirm_all is False
+        if offer_all:
+            prompt = prompt.replace("(y/n)", "(y/n，ya=本轮全部确认)")
+        answer = input(prompt).strip().lower()
+        if offer_all and answer in _CONFIRM_ALL_ANSWERS:
+            TaskExecutor._confirm_all = True
+            return True
+        return answer in _CONFIRM_ANSWERS
+    
+    @staticmethod
+    def _set_wifi_admin_state(state: str) -> Optional[str]:
+        """用netsh启用或禁用WiFi接口（state为"enable"或"disable"），返回切换成功的接口名称，都失败时返回None；
+        直接启动netsh而不经过cmd，并优先尝试上次成功的接口"""
+        candidates = TaskExecutor._WIFI_INTERFACES
+        last_interface = TaskExecutor._wifi_interface
+        if last_interface is not None:
+            candidates = (last_interface,) + tuple(name for name in candidates if name != last_interface)
+        for interface in candidates:
+            try:
+                result = subprocess.run(["netsh", "interface", "set", "interface", interface, f"admin={state}"],
+                                        capture_output=True, text=True, timeout=10)
+            except Exception:
+                continue
+            if result.returncode == 0:
+                TaskExecutor._wifi_interface = interface
+                return interface
+        return None
+    
+    @staticmethod
+    def _get_endpoint_volume():
+        """获取默认播放设备的音量控制接口，首次获取后缓存；未安装pycaw时返回None"""
+        if AudioUtilities is None:
+            return None
+        if TaskExecutor._endpoint_volume is None:
+            speakers = AudioUtilities.GetSpeakers()
+            # 较新版本的pycaw直接提供EndpointVolume，旧版本需要自行激活接口
+            endpoint_volume = getattr(speakers, "EndpointVolume", None)
+            if endpoint_volume is None:
+                interface = speakers.Activate(IAudioEndpointVolume._iid_, CLSCTX_ALL, None)
+                endpoint_volume = ctypes.cast(interface, ctypes.POINTER(IAudioEndpointVolume))
+            TaskExecutor._endpoint_volume = endpoint_volume
+        return TaskExecutor._endpoint_volume
+    
+    @staticmethod
+    def system_control_action(action: str, params: str = "") -> str:
+        """执行系统控制操作（需要用户确认）"""
+        try:
+            if sys.platform != "win32":
+                return "❌ 此功能目前仅支持Windows系统"
+            
+            # 先把各种说法统一为操作名，再按操作名查表分派到对应的处理函数
+            handler = _SYSTEM_CONTROL_HANDLERS.get(_SYSTEM_CONTROL_ACTIONS.get(action.lower()))
+            if handler is None:
+                return f"❌ 不支持的系统控制操作: {action}\n💡 支持的操作包括: WiFi控制、音量调节、启动系统工具等"
+            return handler(params)
+                
+        except Exception as e:
+            return f"❌ 执行系统控制操作失败: {e}"
+    
+    @staticmethod
+    def _disable_wifi(params: str = "") -> str:
+        """关闭WiFi"""
+        print(f"\n⚠️  即将关闭WiFi连接")
+        print("📋 是否确认关闭WiFi？这将断开所有无线网络连接。")
+        if not TaskExecutor._confirm("请输入 (y/n): "):
+            return "❌ WiFi关闭操作已取消"
+
+        try:
+            # 使用netsh命令禁用WiFi
+            interface = TaskExecutor._set_wifi_admin_state("disable")
+            if interface is None:
+                return "❌ 无法找到WiFi网络接口，请手动关闭"
+            if interface == "Wi-Fi":
+                return "✅ WiFi已关闭"
+            return f"✅ WiFi已关闭 (接口: {interface})"
+        except Exception as e:
+            return f"❌ 关闭WiFi失败: {e}"
+    
+    @staticmethod
+    def _enable_wifi(params: str = "") -> str:
+        """开启WiFi"""
+        print(f"\n🔄 即将开启WiFi连接")
+        print("📋 是否确认开启WiFi？")
+        if not TaskExecutor._confirm("请输入 (y/n): "):
+            return "❌ WiFi开启操作已取消"
+
+        try:
+            # 使用netsh命令启用WiFi
+            interface = TaskExecutor._set_wifi_admin_state("enable")
+            if interface is None:
+                return "❌ 无法找到WiFi网络接口，请手动开启"
+            if interface == "Wi-Fi":
+                return "✅ WiFi已开启"
+            return f"✅ WiFi已开启 (接口: {interface})"
+        except Exception as e:
+            return f"❌ 开启WiFi失败: {e}"
+    
+    @staticmethod
+    def _set_volume(params: str = "") -> str:
+        """把系统音量设置为params指定的百分比"""
+        if not params:
+            return "❌ 请指定音量值，例如：调节音量 50（设置为50%）"
+
+        try:
+            volume = int(params.strip().replace('%', ''))
+            if not 0 <= volume <= 100:
+                return "❌ 音量值必须在0-100之间"
+
+            print(f"\n🔊 即将设置系统音量为 {volume}%")
+            print("📋 是否确认调节音量？")
+            if not TaskExecutor._confirm("请输入 (y/n): "):
+                return "❌ 音量调节操作已取消"
+
+            endpoint_volume = TaskExecutor._get_endpoint_volume()
+            if endpoint_volume is not None:
+                endpoint_volume.SetMasterVolumeLevelScalar(volume / 100.0, None)
+                return f"✅ 系统音量已设置为 {volume}%"
+
+            # 未安装pycaw时使用PowerShell设置音量：音量辅助类首次使用时编译为DLL，之后直接加载，
+            # 不必每次都由Add-Type重新编译C#源码
+            dll_existed = os.path.exists(_AUDIO_HELPER_DLL)
+            dll_path = _AUDIO_HELPER_DLL.replace("'", "''")
+            if dll_existed:
+                ps_command = f"Add-Type -Path '{dll_path}'\n"
+            else:
+                ps_command = (f"Add-Type -TypeDefinition @'\n{_AUDIO_HELPER_SOURCE}'@ -OutputAssembly '{dll_path}'\n"
+                              f"Add-Type -Path '{dll_path}'\n")
+            ps_command += f"[Audio]::SetVolume({volume / 100.0})\n"
+            # 脚本含换行和引号，经cmd.exe或命令行引号转义都会被截断或拆开，
+            # 因此不经过shell，并以-EncodedCommand传入UTF-16LE编码后的Base64脚本
+            encoded_command = base64.b64encode(ps_command.encode('utf-16-le')).decode('ascii')
+            result = subprocess.run(["PowerShell.exe", "-NoProfile", "-NonInteractive",
+                                     "-EncodedCommand", encoded_command],
+                                    capture_output=True, text=True, timeout=15)
+            if result.returncode == 0:
+                return f"✅ 系统音量已设置为 {volume}%"
+            else:
+                if dll_existed:
+                    # 已编译的DLL可能已损坏，删除后下次重新编译
+                    try:
+                        os.remove(_AUDIO_HELPER_DLL)
+                    except OSError:
+                        pass
+                return f"❌ 音量调节失败: {result.stderr}"
+
+        except ValueError:
+            return "❌ 音量值必须是数字"
+        except Exception as e:
+            return f"❌ 音量调节失败: {e}"
+    
+    @staticmethod
+    def _mute(params: str = "") -> str:
+        """设置系统静音"""
+        print(f"\n🔇 即将设置系统静音")
+        print("📋 是否确认静音？")
+        if not TaskExecutor._confirm("请输入 (y/n): "):
+            return "❌ 静音操作已取消"
+
+        try:
+            endpoint_volume = TaskExecutor._get_endpoint_volume()
+            if endpoint_volume is not None:
+                endpoint_volume.SetMute(1, None)
+                return "✅ 系统已静音"
+
+            # 未安装pycaw时直接模拟按下并松开静音键，不必启动PowerShell发送按键
+            user32 = ctypes.windll.user32
+            user32.keybd_event(_VK_VOLUME_MUTE, 0, 0, 0)
+            user32.keybd_event(_VK_VOLUME_MUTE, 0, _KEYEVENTF_KEYUP, 0)
+            return "✅ 系统已静音"
+        except Exception as e:
+            return f"❌ 静音操作失败: {e}"
+    
+    @staticmethod
+    def _launch_system_tool(action_key: str, params: str = "") -> str:
+        """启动_SYSTEM_TOOLS中的系统工具，需要确认的工具先询问用户"""
+        name, target, use_shell, confirm_lines = _SYSTEM_TOOLS[action_key]
+        if confirm_lines:
+            for line in confirm_lines:
+                print(line)
+            if not TaskExecutor._confirm("请输入 (y/n): "):
+                return f"❌ {name}启动已取消"
+        
+        try:
+            if use_shell:
+                subprocess.Popen(target, shell=True)
+            else:
+                os.startfile(target)
+            return f"✅ {name}已启动"
+        except Exception as e:
+            return f"❌ 启动{name}失败: {e}"
+    
     @staticmethod
     def list_directory(path: str = ".") -> str:
         """列出目录内容"""
         try:
             files = os.listdir(path)
-            result = f"📁 目录 {os.path.abspath(path)} 的内容:\n"
+            parts = [f"📁 目录 {os.path.abspath(path)} 的内容:\n"]
             for file in files[:20]:  # 限制显示前20个文件
-                result += f"  - {file}\n"
+                parts.append(f"  - {file}\n")
             if len(files) > 20:
-                result += f"  ... 还有 {len(files) - 20} 个文件"
-            return result
+                parts.append(f"  ... 还有 {len(files) - 20} 个文件")
+            return "".join(parts)
         except Exception as e:
             return f"❌ 列出目录失败: {e}"
     
@@ -1619,7 +1352,7 @@ class TaskExecutor:
                 filtered_apps = shortcuts
             
             if filtered_apps:
-                result = f"🔍 找到的应用程序 {'(包含关键词: ' + keyword + ')' if keyword else ''}:\n"
+                parts = [f"🔍 找到的应用程序 {'(包含关键词: ' + keyword + ')' if keyword else ''}:\n"]
                 
                 # 按名称排序
                 sorted_apps = sorted(filtered_apps.items(), key=lambda x: x[0])
@@ -1635,12 +1368,12 @@ class TaskExecutor:
                     
                     # 显示原始名称（首字母大写）
                     display_name = app_name.title()
-                    result += f"  {i:2d}. {display_name} ({location})\n"
+                    parts.append(f"  {i:2d}. {display_name} ({location})\n")
                 
                 if len(sorted_apps) > 30:
-                    result += f"  ... 还有 {len(sorted_apps) - 30} 个应用程序"
+                    parts.append(f"  ... 还有 {len(sorted_apps) - 30} 个应用程序")
                 
-                return result
+                return "".join(parts)
             else:
                 return f"❌ 未找到包含关键词 '{keyword}' 的应用程序"
                 
@@ -1654,20 +1387,12 @@ class TaskExecutor:
             if sys.platform != "win32":
                 return "❌ 此功能目前仅支持Windows系统"
             
-            # 获取桌面路径
-            home_dir = os.path.expanduser("~")
-            desktop_paths = []
-            
-            # 尝试多种桌面路径
-            possible_desktop_names = ["Desktop", "桌面", "desktop"]
-            for desktop_name in possible_desktop_names:
-                desktop_path = os.path.join(home_dir, desktop_name)
-                if os.path.exists(desktop_path):
-                    desktop_paths.append(desktop_path)
+            # 获取桌面路径（尝试多种桌面路径）
+            desktop_paths = [path for path in _USER_DESKTOP_CANDIDATES if os.path.exists(path)]
             
             # 添加公共桌面
-            if os.environ.get("PUBLIC"):
-                public_desktop = os.path.join(os.environ.get("PUBLIC"), "Desktop")
+            if _ENV_PUBLIC:
+                public_desktop = os.path.join(_ENV_PUBLIC, "Desktop")
                 if os.path.exists(public_desktop):
                     desktop_paths.append(public_desktop)
             
@@ -1678,19 +1403,19 @@ class TaskExecutor:
             for desktop_path in desktop_paths:
                 if os.path.exists(desktop_path):
                     try:
-                        for item in os.listdir(desktop_path):
-                            item_path = os.path.join(desktop_path, item)
-                            
-                            if os.path.isdir(item_path) and not item.startswith('.'):
-                                # 文件夹
-                                folders.append(item)
-                            elif item.lower().endswith(('.lnk', '.url')):
-                                # 快捷方式
-                                app_name = item.replace('.lnk', '').replace('.url', '')
-                                shortcuts.append(app_name)
-                            elif os.path.isfile(item_path) and not item.startswith('.'):
-                                # 普通文件
-                                files.append(item)
+                        # DirEntry自带文件类型信息，无需对每一项再调用os.path.isdir/isfile
+                        with os.scandir(desktop_path) as it:
+                            for entry in it:
+                                item = entry.name
+                                if entry.is_dir() and not item.startswith('.'):
+                                    # 文件夹
+                                    folders.append(item)
+                                elif item.lower().endswith(_SHORTCUT_SUFFIXES):
+                                    # 快捷方式（两种后缀都是4个字符）
+                                    shortcuts.append(item[:-4])
+                                elif entry.is_file() and not item.startswith('.'):
+                                    # 普通文件
+                                    files.append(item)
                     except Exception as e:
                         print(f"扫描桌面路径 {desktop_path} 时出错: {e}")
                         continue
@@ -1701,41 +1426,41 @@ class TaskExecutor:
                 "控制面板", "用户文件夹", "库", "文档库", "音乐库", "图片库", "视频库"
             ]
             
-            result = f"🖥️ 桌面内容:\n\n"
+            parts = [f"🖥️ 桌面内容:\n\n"]
             
             # 显示系统项目
-            result += "📁 系统项目:\n"
+            parts.append("📁 系统项目:\n")
             for i, item in enumerate(desktop_system_items, 1):
-                result += f"  {i:2d}. {item}\n"
+                parts.append(f"  {i:2d}. {item}\n")
             
             # 显示文件夹
             if folders:
-                unique_folders = sorted(list(set(folders)), key=str.lower)
-                result += f"\n📂 文件夹 (共{len(unique_folders)}个):\n"
+                unique_folders = sorted(set(folders), key=str.casefold)
+                parts.append(f"\n📂 文件夹 (共{len(unique_folders)}个):\n")
                 for i, folder in enumerate(unique_folders, 1):
-                    result += f"  {i:2d}. {folder}\n"
+                    parts.append(f"  {i:2d}. {folder}\n")
             
             # 显示快捷方式
             if shortcuts:
-                unique_shortcuts = sorted(list(set(shortcuts)), key=str.lower)
-                result += f"\n🔗 快捷方式 (共{len(unique_shortcuts)}个):\n"
+                unique_shortcuts = sorted(set(shortcuts), key=str.casefold)
+                parts.append(f"\n🔗 快捷方式 (共{len(unique_shortcuts)}个):\n")
                 for i, shortcut in enumerate(unique_shortcuts, 1):
-                    result += f"  {i:2d}. {shortcut}\n"
+                    parts.append(f"  {i:2d}. {shortcut}\n")
             
             # 显示普通文件
             if files:
-                unique_files = sorted(list(set(files)), key=str.lower)
-                result += f"\n📄 文件 (共{len(unique_files)}个):\n"
+                unique_files = sorted(set(files), key=str.casefold)
+                parts.append(f"\n📄 文件 (共{len(unique_files)}个):\n")
                 for i, file in enumerate(unique_files[:10], 1):  # 只显示前10个文件
-                    result += f"  {i:2d}. {file}\n"
+                    parts.append(f"  {i:2d}. {file}\n")
                 if len(unique_files) > 10:
-                    result += f"  ... 还有 {len(unique_files) - 10} 个文件\n"
+                    parts.append(f"  ... 还有 {len(unique_files) - 10} 个文件\n")
             
             if not shortcuts and not folders and not files:
-                result += "\n❌ 桌面上没有找到任何项目\n"
-                result += f"💡 检查的桌面路径: {', '.join(desktop_paths)}\n"
+                parts.append("\n❌ 桌面上没有找到任何项目\n")
+                parts.append(f"💡 检查的桌面路径: {', '.join(desktop_paths)}\n")
                 
-            return result
+            return "".join(parts)
                 
         except Exception as e:
             return f"❌ 列出桌面项目失败: {e}"
@@ -1747,51 +1472,51 @@ class TaskExecutor:
             if sys.platform != "win32":
                 return "❌ 此功能目前仅支持Windows系统"
             
-            result = "🛠️ 系统工具和项目:\n\n"
+            parts = ["🛠️ 系统工具和项目:\n\n"]
             
             # 文件管理
-            result += "📁 文件管理:\n"
+            parts.append("📁 文件管理:\n")
             file_items = [
                 "文件管理器", "我的电脑", "计算机", "此电脑", "回收站",
                 "桌面", "文档", "下载", "图片", "音乐", "视频", "网络"
             ]
             for i, item in enumerate(file_items, 1):
-                result += f"  {i:2d}. {item}\n"
+                parts.append(f"  {i:2d}. {item}\n")
             
             # 系统设置
-            result += "\n⚙️ 系统设置:\n"
+            parts.append("\n⚙️ 系统设置:\n")
             settings_items = [
                 "设置", "控制面板", "设备管理器", "注册表编辑器", 
                 "服务管理器", "组策略编辑器", "系统信息", "系统配置"
             ]
             for i, item in enumerate(settings_items, 1):
-                result += f"  {i:2d}. {item}\n"
+                parts.append(f"  {i:2d}. {item}\n")
             
             # 系统工具
-            result += "\n🔧 系统工具:\n"
+            parts.append("\n🔧 系统工具:\n")
             tools_items = [
                 "任务管理器", "性能监视器", "资源监视器", "事件查看器",
                 "磁盘管理", "磁盘清理", "磁盘碎片整理", "截图工具"
             ]
             for i, item in enumerate(tools_items, 1):
-                result += f"  {i:2d}. {item}\n"
+                parts.append(f"  {i:2d}. {item}\n")
             
             # 网络工具
-            result += "\n🌐 网络工具:\n"
+            parts.append("\n🌐 网络工具:\n")
             network_items = [
                 "网络连接", "网络和共享中心", "防火墙", "远程桌面"
             ]
             for i, item in enumerate(network_items, 1):
-                result += f"  {i:2d}. {item}\n"
+                parts.append(f"  {i:2d}. {item}\n")
             
-            return result
+            return "".join(parts)
             
         except Exception as e:
             return f"❌ 列出系统项目失败: {e}"
     
     @staticmethod
     def list_directory_files(path: str) -> Dict[str, str]:
-        """列出指定目录下的所有文件和文件夹，返回名称到完整路径的映射"""
+        """列出指定目录下的所有文件和文件夹，返回名称（保持原始大小写）到完整路径的映射"""
         files_map = {}
         try:
             if path.startswith('~'):
@@ -1799,21 +1524,52 @@ class TaskExecutor:
             elif not os.path.isabs(path):
                 path = os.path.abspath(path)
             
-            if not os.path.exists(path):
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
                 return files_map
             
-            for item in os.listdir(path):
-                item_path = os.path.join(path, item)
-                # 使用小写作为键，便于模糊匹配
-                files_map[item.lower()] = item_path
-                # 同时保存原始名称
-                files_map[item] = item_path
+            # 目录未变化时直接复用上次的列表（批量操作中同一目录常被多次查找）
+            cached = TaskExecutor._dir_listing_cache.get(path)
+            if cached is not None and cached[0] == mtime_ns:
+                return cached[1]
+            
+            # 每个条目只保存一次，不区分大小写的查找由find_file_in_directory统一处理
+            with os.scandir(path) as it:
+                for entry in it:
+                    files_map[entry.name] = entry.path
+            TaskExecutor._dir_listing_cache[path] = (mtime_ns, files_map)
             
         except Exception as e:
             print(f"❌ 读取目录失败: {e}")
         
         return files_map
     
+    @staticmethod
+    def _get_dir_index(directory_files: Dict[str, str]) -> tuple:
+        """返回(条目列表, 小写名称->路径, 小写主文件名->路径, 双字符片段->条目序号)，同一目录映射只构建一次
+        
+        条目为(小写名称, 原始名称, 路径, 核心关键词, 字符集合)；主文件名对应多个文件时记为None；
+        双字符片段只记录最先包含它的条目
+        """
+        if TaskExecutor._dir_index_source is not directory_files:
+            entries = []
+            lower_map = {}
+            stem_map = {}
+            bigrams = {}
+            for position, (name, file_path) in enumerate(directory_files.items()):
+                name_lower = name.lower()
+                stem = os.path.splitext(name_lower)[0]
+                keywords = _strip_file_keywords(stem)
+                entries.append((name_lower, name, file_path, keywords, frozenset(name_lower)))
+                lower_map.setdefault(name_lower, file_path)
+                stem_map[stem] = None if stem in stem_map else file_path
+                for i in range(len(name_lower) - 1):
+                    bigrams.setdefault(name_lower[i:i + 2], position)
+            TaskExecutor._dir_index = (entries, lower_map, stem_map, bigrams)
+            TaskExecutor._dir_index_source = directory_files
+        return TaskExecutor._dir_index
+    
     @staticmethod
     def find_file_in_directory(filename: str, directory_files: Dict[str, str]) -> tuple:
         """在目录文件映射中查找最匹配的文件，使用与应用程序匹配相同的算法"""
@@ -1823,78 +1579,80 @@ class TaskExecutor:
         if filename in directory_files:
             return directory_files[filename], "完全匹配"
         
+        entries, lower_map, stem_map, bigrams = TaskExecutor._get_dir_index(directory_files)
+        
         # 2. 完全匹配（不区分大小写）
-        if filename_lower in directory_files:
-            return directory_files[filename_lower], "完全匹配(忽略大小写)"
+        if filename_lower in lower_map:
+            return lower_map[filename_lower], "完全匹配(忽略大小写)"
         
-        # 3. 双向包含匹配（与应用程序匹配算法一致）
+        # 3. 省略扩展名的完全匹配（如"报告"匹配唯一的"报告.docx"）
+        stem_hit = stem_map.get(filename_lower)
+        if stem_hit:
+            return stem_hit, f"完全匹配(忽略扩展名): {os.path.basename(stem_hit)}"
+        
+        # 4. 双向包含匹配（与应用程序匹配算法一致）
         best_match = None
+        best_name = ""
+        best_kind = ""
         best_score = 0
-        best_type = ""
         
-        for file_key, file_path in directory_files.items():
-            file_basename = os.path.basename(file_path).lower()
+        # 搜索词的核心关键词（去除扩展名和常见词汇）与文件无关，只提取一次
+        filename_keywords = _strip_file_keywords(os.path.splitext(filename_lower)[0])
+        
+        for file_basename, name, file_path, file_keywords, _ in entries:
             score = 0
-            match_type = ""
+            kind = ""
             
             # 搜索词包含在文件名中
             if filename_lower in file_basename:
                 score = len(filename_lower) / len(file_basename)
-                match_type = f"包含匹配: {os.path.basename(file_path)}"
+                kind = "包含匹配"
             
             # 文件名包含在搜索词中
             elif file_basename in filename_lower:
                 score = len(file_basename) / len(filename_lower)
-                match_type = f"被包含匹配: {os.path.basename(file_path)}"
-            
-            # 开头匹配
-            elif file_basename.startswith(filename_lower) or filename_lower.startswith(file_basename):
-                if file_basename.startswith(filename_lower):
-                    score = len(filename_lower) / len(file_basename)
-                else:
-                    score = len(file_basename) / len(filename_lower)
-                match_type = f"开头匹配: {os.path.basename(file_path)}"
+                kind = "被包含匹配"
             
             # 关键词匹配（去掉常见后缀）
-            else:
-                # 提取核心关键词，去除扩展名和常见词汇
-                filename_keywords = os.path.splitext(filename_lower)[0].replace('应用', '').replace('软件', '').replace('程序', '').replace('工具', '').strip()
-                file_keywords = os.path.splitext(file_basename)[0].replace('应用', '').replace('软件', '').replace('程序', '').replace('工具', '').strip()
-                
-                if filename_keywords and file_keywords:
-                    if filename_keywords in file_keywords or file_keywords in filename_keywords:
-                        score = min(len(filename_keywords), len(file_keywords)) / max(len(filename_keywords), len(file_keywords))
-                        match_type = f"关键词匹配: {os.path.basename(file_path)}"
+            elif filename_keywords and file_keywords:
+                if filename_keywords in file_keywords or file_keywords in filename_keywords:
+                    score = min(len(filename_keywords), len(file_keywords)) / max(len(filename_keywords), len(file_keywords))
+                    kind = "关键词匹配"
             
             # 更新最佳匹配
             if score > best_score:
                 best_score = score
                 best_match = file_path
-                best_type = match_type
+                best_name = name
+                best_kind = kind
         
         # 如果找到了匹配项且分数足够高
         if best_match and best_score >= 0.2:  # 降低阈值，提高匹配成功率
-            return best_match, best_type
-        
-        # 4. 模糊匹配（字符级别匹配）
-        for file_key, file_path in directory_files.items():
-            file_basename = os.path.basename(file_path).lower()
+            return best_match, f"{best_kind}: {best_name}"
+        
+        # 5. 模糊匹配（字符级别匹配）
+        # 搜索词的字符集合只计算一次
+        query_chars = set(filename_lower)
+        query_char_count = len(query_chars)
+        for _, name, file_path, _, file_chars in entries:
+            file_char_count = len(file_chars)
+            # 共同字符数不超过搜索词字符数，文件字符种类过多时比例不可能达到阈值，直接跳过
+            if file_char_count > query_char_count and query_char_count / file_char_count < 0.4:
+                continue
             # 计算共同字符数
-            common_chars = set(filename_lower) & set(file_basename)
+            common_chars = query_chars & file_chars
             if common_chars:
-                match_ratio = len(common_chars) / max(len(set(filename_lower)), len(set(file_basename)))
+                match_ratio = len(common_chars) / max(query_char_count, file_char_count)
                 if match_ratio >= 0.4:  # 字符匹配阈值
-                    return file_path, f"字符匹配: {os.path.basename(file_path)}"
-        
-        # 5. 部分匹配（针对中文名称的特殊处理）
-        for file_key, file_path in directory_files.items():
-            file_basename = os.path.basename(file_path).lower()
-            # 检查是否有任何连续的字符匹配
-            for i in range(len(filename_lower)):
-                for j in range(i + 2, len(filename_lower) + 1):  # 至少2个字符
-                    substring = filename_lower[i:j]
-                    if len(substring) >= 2 and substring in file_basename:
-                        return file_path, f"部分匹配: {os.path.basename(file_path)}"
+                    return file_path, f"字符匹配: {name}"
+        
+        # 6. 部分匹配（针对中文名称的特殊处理）
+        # 文件名包含搜索词中某段长度>=2的连续字符，等价于包含其中某个相邻双字，直接查双字索引取最先出现的文件
+        hits = [bigrams[filename_lower[i:i + 2]] for i in range(len(filename_lower) - 1)
+                if filename_lower[i:i + 2] in bigrams]
+        if hits:
+            _, name, file_path, _, _ = entries[min(hits)]
+            return file_path, f"部分匹配: {name}"
         
         return None, None
     
@@ -1905,7 +1663,8 @@ class TaskExecutor:
             if not operation_list:
                 return "❌ 没有要执行的文件操作"
             
-            # 解析所有操作
+            # 解析所有操作，相对路径统一基于本批操作开始时的工作目录
+            cwd = os.getcwd()
             operations = []
             for params in operation_list:
                 parts = params.split('|')
@@ -1928,10 +1687,7 @@ class TaskExecutor:
                     else:
                         continue  # 跳过格式错误的操作
                     
-                    if path.startswith('~'):
-                        path = os.path.expanduser(path)
-                    elif not os.path.isabs(path):
-                        path = os.path.abspath(path)
+                    path = _resolve_path(path, cwd)
                     
                     operation_info.update({
                         "path": path,
@@ -1943,10 +1699,7 @@ class TaskExecutor:
                     file_path = parts[1].strip()
                     content = parts[2].strip()
                     
-                    if file_path.startswith('~'):
-                        file_path = os.path.expanduser(file_path)
-                    elif not os.path.isabs(file_path):
-                        file_path = os.path.abspath(file_path)
+                    file_path = _resolve_path(file_path, cwd)
                     
                     operation_info.update({
                         "file_path": file_path,
@@ -1955,10 +1708,7 @@ class TaskExecutor:
                 elif action == "新建文件夹" and len(parts) >= 3:
                     path = parts[1].strip()
                     dirname = parts[2].strip()
-                    if path.startswith('~'):
-                        path = os.path.expanduser(path)
-                    elif not os.path.isabs(path):
-                        path = os.path.abspath(path)
+                    path = _resolve_path(path, cwd)
                     operation_info.update({
                         "path": path,
                         "dirname": dirname,
@@ -1966,10 +1716,7 @@ class TaskExecutor:
                     })
                 elif action == "删除":
                     path = parts[1].strip()
-                    if path.startswith('~'):
-                        path = os.path.expanduser(path)
-                    elif not os.path.isabs(path):
-                        path = os.path.abspath(path)
+                    path = _resolve_path(path, cwd)
                     
                     # 如果路径不存在，尝试在父目录中查找匹配的文件
                     if not os.path.exists(path):
@@ -1989,10 +1736,7 @@ class TaskExecutor:
                     target = parts[2].strip()
                     
                     # 处理源路径
-                    if path.startswith('~'):
-                        path = os.path.expanduser(path)
-                    elif not os.path.isabs(path):
-                        path = os.path.abspath(path)
+                    path = _resolve_path(path, cwd)
                     
                     # 如果源路径不存在，尝试在父目录中查找匹配的文件
                     original_path = path
@@ -2008,19 +1752,16 @@ class TaskExecutor:
                                 path = matched_path
                             else:
                                 # 显示可用文件供参考
-                                available_files = [os.path.basename(p) for p in directory_files.values()][:5]
+                                available_files = list(directory_files)[:5]
                                 if available_files:
                                     print(f"💡 目录中的文件包括: {', '.join(available_files)}{'...' if len(directory_files) > 5 else ''}")
                     
                     # 处理目标路径
-                    if target.startswith('~'):
-                        target = os.path.expanduser(target)
-                    elif not os.path.isabs(target):
+                    if action == "重命名" and not target.startswith('~') and not os.path.isabs(target):
                         # 对于重命名操作，如果目标不是绝对路径，则在源文件的目录中重命名
-                        if action == "重命名":
-                            target = os.path.join(os.path.dirname(path), target)
-                        else:
-                            target = os.path.abspath(target)
+                        target = os.path.join(os.path.dirname(path), target)
+                    else:
+                        target = _resolve_path(target, cwd)
                     
                     # 对于复制操作，如果目标路径只是一个文件名，则复制到同一目录
                     if action == "复制" and not os.path.dirname(target):
@@ -2031,35 +1772,40 @@ class TaskExecutor:
                         "target": target,
                         "original_path": original_path  # 保存原始路径用于错误提示
                     })
+                    if action == "重命名":
+                        # 重命名始终在源文件所在目录进行，新路径在解析时计算一次
+                        operation_info["new_path"] = os.path.join(os.path.dirname(path), os.path.basename(target))
                 
                 operations.append(operation_info)
             
             if not operations:
                 return "❌ 没有有效的文件操作"
             
-            # 显示所有操作的摘要并请求用户确认
+            # 显示所有操作的摘要并请求用户确认（摘要先收集成行，最后一次性输出）
             if len(operations) > 1:
-                print(f"\n🔄 检测到多任务操作，共 {len(operations)} 个任务:")
+                summary_lines = [f"\n🔄 检测到多任务操作，共 {len(operations)} 个任务:"]
             else:
-                print(f"\n🔄 检测到单任务操作:")
+                summary_lines = [f"\n🔄 检测到单任务操作:"]
             
             for i, op in enumerate(operations, 1):
                 if op["action"] == "新建文件":
-                    print(f"  {i}. 新建文件: {op.get('path', '未知路径')}/{op.get('filename', '未知文件')}")
+                    summary_lines.append(f"  {i}. 新建文件: {op.get('path', '未知路径')}/{op.get('filename', '未知文件')}")
                 elif op["action"] == "新建文件夹":
-                    print(f"  {i}. 新建文件夹: {op.get('path', '未知路径')}/{op.get('dirname', '未知文件夹')}")
+                    summary_lines.append(f"  {i}. 新建文件夹: {op.get('path', '未知路径')}/{op.get('dirname', '未知文件夹')}")
                 elif op["action"] == "删除":
-                    print(f"  {i}. 删除: {op.get('path', '未知路径')}")
+                    summary_lines.append(f"  {i}. 删除: {op.get('path', '未知路径')}")
                 elif op["action"] == "重命名":
-                    print(f"  {i}. 重命名: {op.get('path', '未知路径')} -> {op.get('target', '未知目标')}")
+                    summary_lines.append(f"  {i}. 重命名: {op.get('path', '未知路径')} -> {op.get('target', '未知目标')}")
                 elif op["action"] == "复制":
-                    print(f"  {i}. 复制: {op.get('path', '未知路径')} -> {op.get('target', '未知目标')}")
+                    summary_lines.append(f"  {i}. 复制: {op.get('path', '未知路径')} -> {op.get('target', '未知目标')}")
                 elif op["action"] == "剪切":
-                    print(f"  {i}. 剪切: {op.get('path', '未知路径')} -> {op.get('target', '未知目标')}")
+                    summary_lines.append(f"  {i}. 剪切: {op.get('path', '未知路径')} -> {op.get('target', '未知目标')}")
                 elif op["action"] == "写入文件":
                     file_path = op.get('file_path', '未知路径')
                     content_preview = op.get('content', '')[:20] + ('...' if len(op.get('content', '')) > 20 else '')
-                    print(f"  {i}. 写入文件: {file_path} (内容: {content_preview})")
+                    summary_lines.append(f"  {i}. 写入文件: {file_path} (内容: {content_preview})")
+            
+            print("\n".join(summary_lines))
             
             # 对所有操作都请求用户确认
             if len(operations) > 1:
@@ -2067,183 +1813,22 @@ class TaskExecutor:
             else:
                 print("\n📋 是否确认执行此操作？")
             
-            confirm = input("请输入 (y/n): ").strip().lower()
-            if confirm not in ['y', 'yes', '是', '确认']:
+            if not TaskExecutor._confirm("请输入 (y/n): "):
                 if len(operations) > 1:
                     return "❌ 批量操作已取消"
                 else:
                     return "❌ 操作已取消"
             
-            # 执行所有操作
-            results = []
-            success_count = 0
+            # 执行所有操作：互不涉及相同路径的操作并发执行，否则按顺序执行
+            task_numbers = range(1, len(operations) + 1)
+            if len(operations) > 1 and not TaskExecutor._file_operations_overlap(operations):
+                with ThreadPoolExecutor(max_workers=min(8, len(operations))) as pool:
+                    outcomes = list(pool.map(TaskExecutor._execute_file_operation, task_numbers, operations))
+            else:
+                outcomes = [TaskExecutor._execute_file_operation(i, op) for i, op in zip(task_numbers, operations)]
             
-            for i, op in enumerate(operations, 1):
-                try:
-                    if op["action"] == "新建文件":
-                        path = op["path"]
-                        filename = op["filename"]
-                        full_path = op["full_path"]
-                        
-                        if not os.path.exists(path):
-                            results.append(f"❌ 任务{i}: 目录不存在: {path}")
-                            continue
-                        if os.path.exists(full_path):
-                            results.append(f"❌ 任务{i}: 文件已存在: {full_path}")
-                            continue
-                        
-                        with open(full_path, 'w', encoding='utf-8') as f:
-                            f.write("")
-                        results.append(f"✅ 任务{i}: 已创建文件: {filename}")
-                        success_count += 1
-                    
-                    elif op["action"] == "新建文件夹":
-                        path = op["path"]
-                        dirname = op["dirname"]
-                        full_path = op["full_path"]
-                        
-                        if not os.path.exists(path):
-                            results.append(f"❌ 任务{i}: 目录不存在: {path}")
-                            continue
-                        if os.path.exists(full_path):
-                            results.append(f"❌ 任务{i}: 文件夹已存在: {full_path}")
-                            continue
-                        
-                        os.makedirs(full_path)
-                        results.append(f"✅ 任务{i}: 已创建文件夹: {dirname}")
-                        success_count += 1
-                    
-                    elif op["action"] == "删除":
-                        path = op["path"]
-                        
-                        if not os.path.exists(path):
-                            results.append(f"❌ 任务{i}: 路径不存在: {path}")
-                            continue
-                        
-                        if os.path.isfile(path):
-                            os.remove(path)
-                            results.append(f"✅ 任务{i}: 已删除文件: {os.path.basename(path)}")
-                        elif os.path.isdir(path):
-                            shutil.rmtree(path)
-                            results.append(f"✅ 任务{i}: 已删除文件夹: {os.path.basename(path)}")
-                        success_count += 1
-                    
-                    elif op["action"] == "重命名":
-                        path = op["path"]
-                        new_name = os.path.basename(op["target"])
-                        parent_dir = os.path.dirname(path)
-                        new_path = os.path.join(parent_dir, new_name)
-                        
-                        if not os.path.exists(path):
-                            results.append(f"❌ 任务{i}: 路径不存在: {path}")
-                            continue
-                        if os.path.exists(new_path):
-                            results.append(f"❌ 任务{i}: 目标路径已存在: {new_path}")
-                            continue
-                        
-                        os.rename(path, new_path)
-                        results.append(f"✅ 任务{i}: 已重命名: {os.path.basename(path)} -> {new_name}")
-                        success_count += 1
-                    
-                    elif op["action"] == "复制":
-                        path = op["path"]
-                        dest_path = op["target"]
-                        
-                        if not os.path.exists(path):
-                            original_path = op.get("original_path", path)
-                            results.append(f"❌ 任务{i}: 源路径不存在: {original_path}")
-                            continue
-                        
-                        # 如果目标文件已存在，自动生成新的文件名
-                        # 如果目标文件已存在，自动生成新的文件名
-                        if os.path.exists(dest_path):
-                            base_name, ext = os.path.splitext(dest_path)
-                            counter = 1
-                            while os.path.exists(dest_path):
-                                if ext:
-                                    dest_path = f"{base_name}_副本{counter if counter > 1 else ''}{ext}"
-                                else:
-                                    dest_path = f"{base_name}_副本{counter if counter > 1 else ''}"
-                                counter += 1
-                        
-                        # 特殊处理：如果目标路径看起来像是要创建副本（包含原文件名）
-                        elif os.path.basename(dest_path).startswith(os.path.splitext(os.path.basename(path))[0]):
-                            # 检查是否是类似 "test.txt副本" 这样的格式
-                            dest_basename = os.path.basename(dest_path)
-                            src_basename_no_ext = os.path.splitext(os.path.basename(path))[0]
-                            src_ext = os.path.splitext(os.path.basename(path))[1]
-                            
-                            # 如果目标文件名是 "原文件名副本" 格式，修正为 "原文件名_副本.扩展名"
-                            if dest_basename == f"{src_basename_no_ext}副本" or dest_basename.endswith("副本"):
-                                if "副本" in dest_basename and not dest_basename.endswith(src_ext):
-                                    # 重新构建正确的文件名
-                                    dest_path = os.path.join(os.path.dirname(dest_path), f"{src_basename_no_ext}_副本{src_ext}")
-                        
-                        try:
-                            if os.path.isfile(path):
-                                # 如果目标是目录，则在目录中创建文件
-                                if os.path.isdir(dest_path):
-                                    dest_path = os.path.join(dest_path, os.path.basename(path))
-                                shutil.copy2(path, dest_path)
-                                results.append(f"✅ 任务{i}: 已复制文件: {os.path.basename(path)} -> {os.path.basename(dest_path)}")
-                            elif os.path.isdir(path):
-                                # 复制文件夹
-                                if os.path.exists(dest_path):
-                                    dest_path = os.path.join(dest_path, os.path.basename(path))
-                                shutil.copytree(path, dest_path)
-                                results.append(f"✅ 任务{i}: 已复制文件夹: {os.path.basename(path)} -> {os.path.basename(dest_path)}")
-                            success_count += 1
-                        except Exception as copy_error:
-                            results.append(f"❌ 任务{i}: 复制失败: {copy_error}")
-                    
-                    elif op["action"] == "剪切":
-                        path = op["path"]
-                        dest_path = op["target"]
-                        
-                        if not os.path.exists(path):
-                            results.append(f"❌ 任务{i}: 源路径不存在: {path}")
-                            continue
-                        
-                        if os.path.isdir(dest_path):
-                            dest_path = os.path.join(dest_path, os.path.basename(path))
-                        
-                        shutil.move(path, dest_path)
-                        results.append(f"✅ 任务{i}: 已移动: {os.path.basename(path)}")
-                        success_count += 1
-                    
-                    elif op["action"] == "写入文件":
-                        file_path = op["file_path"]
-                        content = op["content"]
-                        
-                        try:
-                            # 确保目录存在
-                            directory = os.path.dirname(file_path)
-                            if directory and not os.path.exists(directory):
-                                os.makedirs(directory, exist_ok=True)
-                            
-                            # 检查文件扩展名，确保支持的格式
-                            file_ext = os.path.splitext(file_path)[1].lower()
-                            supported_formats = ['.txt', '.md', '.markdown', '.text']
-                            
-                            if file_ext not in supported_formats:
-                                results.append(f"❌ 任务{i}: 不支持的文件格式: {file_ext}，目前支持: {', '.join(supported_formats)}")
-                                continue
-                            
-                            # 写入文件
-                            with open(file_path, 'w', encoding='utf-8') as f:
-                                f.write(content)
-                            
-                            file_size = os.path.getsize(file_path)
-                            file_size_kb = file_size / 1024
-                            
-                            results.append(f"✅ 任务{i}: 内容已写入文件: {os.path.basename(file_path)} ({file_size_kb:.1f} KB)")
-                            success_count += 1
-                            
-                        except Exception as write_error:
-                            results.append(f"❌ 任务{i}: 写入文件失败: {write_error}")
-                
-                except Exception as e:
-                    results.append(f"❌ 任务{i}: 操作失败: {e}")
+            results = [message for _, message in outcomes if message]
+            success_count = sum(1 for success, _ in outcomes if success)
             
             # 生成总结
             summary = f"\n📊 批量操作完成: 成功 {success_count}/{len(operations)} 个任务"
@@ -2252,6 +1837,179 @@ class TaskExecutor:
         except Exception as e:
             return f"❌ 批量文件操作失败: {e}"
     
+    @staticmethod
+    def _file_operation_paths(op: dict) -> List[str]:
+        """返回文件操作会读取或修改的所有路径（已规范化）"""
+        if op["action"] in ("新建文件", "新建文件夹"):
+            # 所在目录只做存在性检查，只有新建的完整路径才会被修改
+            paths = [op.get("full_path")]
+        else:
+            paths = [op.get(key) for key in ("path", "file_path", "target", "new_path")]
+        return [os.path.normcase(os.path.normpath(path)) for path in paths if path]
+    
+    @staticmethod
+    def _file_operations_overlap(operations: List[dict]) -> bool:
+        """判断是否有两个操作涉及相同路径或互为父子路径（如先建文件夹再在其中建文件）"""
+        seen = []
+        for op in operations:
+            paths = TaskExecutor._file_operation_paths(op)
+            for path in paths:
+                for other in seen:
+                    if (path == other or path.startswith(other.rstrip(os.sep) + os.sep)
+                            or other.startswith(path.rstrip(os.sep) + os.sep)):
+                        return True
+            seen.extend(paths)
+        return False
+    
+    @staticmethod
+    def _execute_file_operation(i: int, op: dict) -> tuple:
+        """执行单个已确认的文件操作，返回(是否成功, 结果信息)"""
+        try:
+            if op["action"] == "新建文件":
+                path = op["path"]
+                filename = op["filename"]
+                full_path = op["full_path"]
+                
+                if not os.path.exists(path):
+                    return False, f"❌ 任务{i}: 目录不存在: {path}"
+                if os.path.exists(full_path):
+                    return False, f"❌ 任务{i}: 文件已存在: {full_path}"
+                
+                with open(full_path, 'w', encoding='utf-8') as f:
+                    f.write("")
+                return True, f"✅ 任务{i}: 已创建文件: {filename}"
+            
+            elif op["action"] == "新建文件夹":
+                path = op["path"]
+                dirname = op["dirname"]
+                full_path = op["full_path"]
+                
+                if not os.path.exists(path):
+                    return False, f"❌ 任务{i}: 目录不存在: {path}"
+                if os.path.exists(full_path):
+                    return False, f"❌ 任务{i}: 文件夹已存在: {full_path}"
+                
+                os.makedirs(full_path)
+                return True, f"✅ 任务{i}: 已创建文件夹: {dirname}"
+            
+            elif op["action"] == "删除":
+                path = op["path"]
+                
+                # 一次stat同时完成存在性和类型判断
+                path_stat = _stat_or_none(path)
+                if path_stat is None:
+                    return False, f"❌ 任务{i}: 路径不存在: {path}"
+                
+                if stat.S_ISREG(path_stat.st_mode):
+                    os.remove(path)
+                    return True, f"✅ 任务{i}: 已删除文件: {os.path.basename(path)}"
+                elif stat.S_ISDIR(path_stat.st_mode):
+                    shutil.rmtree(path)
+                    return True, f"✅ 任务{i}: 已删除文件夹: {os.path.basename(path)}"
+                return True, None
+            
+            elif op["action"] == "重命名":
+                path = op["path"]
+                new_path = op["new_path"]
+                new_name = os.path.basename(new_path)
+                
+                if not os.path.exists(path):
+                    return False, f"❌ 任务{i}: 路径不存在: {path}"
+                if os.path.exists(new_path):
+                    return False, f"❌ 任务{i}: 目标路径已存在: {new_path}"
+                
+                os.rename(path, new_path)
+                return True, f"✅ 任务{i}: 已重命名: {os.path.basename(path)} -> {new_name}"
+            
+            elif op["action"] == "复制":
+                path = op["path"]
+                dest_path = op["target"]
+                
+                # 一次stat同时完成存在性和类型判断
+                path_stat = _stat_or_none(path)
+                if path_stat is None:
+                    original_path = op.get("original_path", path)
+                    return False, f"❌ 任务{i}: 源路径不存在: {original_path}"
+                
+                # 源文件名各部分只计算一次
+                src_basename = os.path.basename(path)
+                src_basename_no_ext, src_ext = os.path.splitext(src_basename)
+                dest_basename = os.path.basename(dest_path)
+                
+                # 如果目标文件已存在，自动生成新的文件名（_副本、_副本2、_副本3……）
+                if os.path.exists(dest_path):
+                    base_name, ext = os.path.splitext(dest_path)
+                    dest_path = f"{base_name}_副本{ext}"
+                    counter = 2
+                    while os.path.exists(dest_path):
+                        dest_path = f"{base_name}_副本{counter}{ext}"
+                        counter += 1
+                
+                # 特殊处理：如果目标路径看起来像是要创建副本（包含原文件名）
+                # 目标文件名是 "test.txt副本" 这类以"副本"结尾却丢了扩展名的格式时，修正为 "原文件名_副本.扩展名"
+                elif (dest_basename.startswith(src_basename_no_ext) and dest_basename.endswith("副本")
+                        and not dest_basename.endswith(src_ext)):
+                    dest_path = os.path.join(os.path.dirname(dest_path), f"{src_basename_no_ext}_副本{src_ext}")
+                
+                try:
+                    if stat.S_ISREG(path_stat.st_mode):
+                        # 如果目标是目录，则在目录中创建文件
+                        if os.path.isdir(dest_path):
+                            dest_path = os.path.join(dest_path, src_basename)
+                        shutil.copy2(path, dest_path)
+                        return True, f"✅ 任务{i}: 已复制文件: {src_basename} -> {os.path.basename(dest_path)}"
+                    elif stat.S_ISDIR(path_stat.st_mode):
+                        # 复制文件夹
+                        if os.path.exists(dest_path):
+                            dest_path = os.path.join(dest_path, src_basename)
+                        shutil.copytree(path, dest_path)
+                        return True, f"✅ 任务{i}: 已复制文件夹: {src_basename} -> {os.path.basename(dest_path)}"
+                    return True, None
+                except Exception as copy_error:
+                    return False, f"❌ 任务{i}: 复制失败: {copy_error}"
+            
+            elif op["action"] == "剪切":
+                path = op["path"]
+                dest_path = op["target"]
+                
+                if not os.path.exists(path):
+                    return False, f"❌ 任务{i}: 源路径不存在: {path}"
+                
+                if os.path.isdir(dest_path):
+                    dest_path = os.path.join(dest_path, os.path.basename(path))
+                
+                shutil.move(path, dest_path)
+                return True, f"✅ 任务{i}: 已移动: {os.path.basename(path)}"
+            
+            elif op["action"] == "写入文件":
+                file_path = op["file_path"]
+                content = op["content"]
+                
+                try:
+                    # 确保目录存在
+                    directory = os.path.dirname(file_path)
+                    if directory and not os.path.exists(directory):
+                        os.makedirs(directory, exist_ok=True)
+                    
+                    # 检查文件扩展名，确保支持的格式
+                    file_ext = os.path.splitext(file_path)[1].lower()
+                    supported_formats = ['.txt', '.md', '.markdown', '.text']
+                    
+                    if file_ext not in supported_formats:
+                        return False, f"❌ 任务{i}: 不支持的文件格式: {file_ext}，目前支持: {', '.join(supported_formats)}"
+                    
+                    # 写入文件
+                    file_size = _write_text_file(file_path, content, 'utf-8')
+                    file_size_kb = file_size / 1024
+                    
+                    return True, f"✅ 任务{i}: 内容已写入文件: {os.path.basename(file_path)} ({file_size_kb:.1f} KB)"
+                    
+                except Exception as write_error:
+                    return False, f"❌ 任务{i}: 写入文件失败: {write_error}"
+        except Exception as e:
+            return False, f"❌ 任务{i}: 操作失败: {e}"
+        return False, None
+    
     @staticmethod
     def write_content_to_file(file_path: str, content: str, encoding: str = 'utf-8') -> str:
         """将内容写入到指定文件"""
@@ -2275,10 +2033,7 @@ class TaskExecutor:
                 return f"❌ 不支持的文件格式: {file_ext}，目前支持: {', '.join(supported_formats)}"
             
             # 写入文件
-            with open(file_path, 'w', encoding=encoding) as f:
-                f.write(content)
-            
-            file_size = os.path.getsize(file_path)
+            file_size = _write_text_file(file_path, content, encoding)
             file_size_kb = file_size / 1024
             
             return f"✅ 内容已成功写入文件: {os.path.basename(file_path)}\n📄 文件大小: {file_size_kb:.1f} KB\n📍 文件路径: {file_path}"
@@ -2291,23 +2046,21 @@ class TaskExecutor:
         """执行单个文件和文件夹操作（保留兼容性）"""
         return TaskExecutor.batch_file_operations([params])
 
-class AIDesktopAssistant:
-    """AI桌面助手主类"""
-    
-    def __init__(self, quick_mode=False):
-        self.ollama_client = OllamaClient()
-        self.task_executor = TaskExecutor()
-        self.current_model = None
-        self.quick_mode = quick_mode
-        self.system_prompt = self._get_system_prompt(quick_mode)
-        self.conversation_history = []  # 存储对话历史
-        self.max_history_length = 20  # 最大历史记录长度
-        
-    def _get_system_prompt(self, quick_mode=False) -> str:
-        """获取系统提示词"""
-        if quick_mode:
-            # 简化的系统提示词，用于快速启动
-            return """你是智能桌面助手。当用户需要执行任务时，用以下格式回复：
+# 系统控制操作名 -> 处理函数（参数为操作参数字符串），system_control_action按操作名一次查表分派
+_SYSTEM_CONTROL_HANDLERS = {
+    "关闭wifi": TaskExecutor._disable_wifi,
+    "开启wifi": TaskExecutor._enable_wifi,
+    "调节音量": TaskExecutor._set_volume,
+    "静音": TaskExecutor._mute,
+}
+_SYSTEM_CONTROL_HANDLERS.update((action_key, functools.partial(TaskExecutor._launch_system_tool, action_key))
+                                for action_key in _SYSTEM_TOOLS)
+
+# 回复缓存最多保存的对话轮数
+_REPLY_CACHE_SIZE = 128
+
+# 快速启动模式使用的简化系统提示词
+_QUICK_SYSTEM_PROMPT = """你是智能桌面助手。当用户需要执行任务时，用以下格式回复：
 
 打开应用: [TASK:OPEN_APP]应用名[/TASK]
 系统信息: [TASK:SYSTEM_INFO][/TASK]
@@ -2318,8 +2071,9 @@ class AIDesktopAssistant:
 系统控制: [TASK:SYSTEM_CONTROL]操作|参数[/TASK]
 
 用中文回答，保持友好专业。"""
-        
-        return """你是一个智能桌面助手，可以帮助用户执行各种任务。
+
+# 完整系统提示词
+_SYSTEM_PROMPT = """你是一个智能桌面助手，可以帮助用户执行各种任务。
 
 当用户需要执行特定任务时，请按照以下格式回复：
 
@@ -2433,6 +2187,25 @@ class AIDesktopAssistant:
 
 请用中文回答，保持友好和专业的语调。"""
 
+class AIDesktopAssistant:
+    """AI桌面助手主类"""
+    
+    def __init__(self, quick_mode=False):
+        self.ollama_client = OllamaClient()
+        self.task_executor = TaskExecutor()
+        self.current_model = None
+        self.quick_mode = quick_mode
+        self.system_prompt = self._get_system_prompt(quick_mode)
+        self.conversation_history = deque()  # 存储对话历史，从左端淘汰最早的记录
+        self._history_role_counts = {"user": 0, "assistant": 0}  # 各角色消息数，随历史增删同步更新
+        self.max_history_length = 20  # 最大历史记录长度
+        self._reply_cache = OrderedDict()  # 对话上下文 -> AI回复，按最近使用顺序淘汰
+        
+    def _get_system_prompt(self, quick_mode=False) -> str:
+        """获取系统提示词"""
+        # 简化的系统提示词用于快速启动
+        return _QUICK_SYSTEM_PROMPT if quick_mode else _SYSTEM_PROMPT
+
     def list_available_models(self) -> List[Dict]:
         """列出可用的模型"""
         return self.ollama_client.list_models()
@@ -2452,18 +2225,27 @@ class AIDesktopAssistant:
         if not self.current_model:
             return "❌ 请先选择一个AI模型"
         
+        # 上下文完全相同时直接复用之前的回复，不再请求模型
+        cache_key = self._reply_cache_key(user_input)
+        cached_response = self._get_cached_reply(cache_key)
+        
         # 添加用户输入到对话历史
-        self.conversation_history.append({"role": "user", "content": user_input})
+        self._append_history("user", user_input)
         
         # 获取AI回复
-        ai_response = self.ollama_client.chat(
-            model=self.current_model,
-            messages=self.conversation_history,
-            system_prompt=self.system_prompt
-        )
+        if cached_response is not None:
+            ai_response = cached_response
+        else:
+            ai_response = self.ollama_client.chat(
+                model=self.current_model,
+                messages=self.conversation_history,
+                system_prompt=self.system_prompt
+            )
+            if not self.ollama_client.last_request_failed:
+                self._cache_reply(cache_key, ai_response)
         
         # 添加AI回复到对话历史
-        self.conversation_history.append({"role": "assistant", "content": ai_response})
+        self._append_history("assistant", ai_response)
         
         # 限制历史记录长度
         self._trim_conversation_history()
@@ -2483,21 +2265,33 @@ class AIDesktopAssistant:
             yield "❌ 请先选择一个AI模型"
             return
         
+        # 上下文完全相同时直接复用之前的回复，不再请求模型
+        cache_key = self._reply_cache_key(user_input)
+        cached_response = self._get_cached_reply(cache_key)
+        
         # 添加用户输入到对话历史
-        self.conversation_history.append({"role": "user", "content": user_input})
-        
-        # 流式获取AI回复
-        ai_response = ""
-        for chunk in self.ollama_client.chat_stream(
-            model=self.current_model,
-            messages=self.conversation_history,
-            system_prompt=self.system_prompt
-        ):
-            ai_response += chunk
-            yield chunk
+        self._append_history("user", user_input)
+        
+        if cached_response is not None:
+            ai_response = cached_response
+            yield ai_response
+        else:
+            # 流式获取AI回复；只合并模型回复的小块，回复结束时缓冲区已全部产出，
+            # 之后执行任务时的输出和确认提示不会插到回复末尾之前
+            chunks = []
+            for chunk in buffered_stream(self.ollama_client.chat_stream(
+                model=self.current_model,
+                messages=self.conversation_history,
+                system_prompt=self.system_prompt
+            )):
+                chunks.append(chunk)
+                yield chunk
+            ai_response = "".join(chunks)
+            if not self.ollama_client.last_request_failed:
+                self._cache_reply(cache_key, ai_response)
         
         # 添加AI回复到对话历史
-        self.conversation_history.append({"role": "assistant", "content": ai_response})
+        self._append_history("assistant", ai_response)
         
         # 限制历史记录长度
         self._trim_conversation_history()
@@ -2511,63 +2305,62 @@ class AIDesktopAssistant:
     
     def _parse_and_execute_tasks(self, ai_response: str) -> str:
         """解析AI回复中的任务标记并执行"""
+        # 一次扫描收集所有任务标记，按类型分组后再按固定顺序执行
+        tasks = {}
+        for match in _TASK_RE.finditer(ai_response):
+            if match.group('write_kind'):
+                kind, body = match.group('write_kind', 'write_body')
+            else:
+                kind, body = match.group('kind', 'body')
+            tasks.setdefault(kind, []).append(body)
+        
+        # 多个任务时允许用户在第一次确认时选择全部确认，本轮结束后恢复逐项确认
+        if sum(len(bodies) for bodies in tasks.values()) > 1:
+            TaskExecutor._confirm_all = False
+        try:
+            return self._execute_tasks(tasks)
+        finally:
+            TaskExecutor._confirm_all = None
+    
+    def _execute_tasks(self, tasks: Dict[str, List[str]]) -> str:
+        """按固定顺序执行已按类型分组的任务，返回各任务结果"""
         results = []
         
         # 匹配打开应用任务
-        open_app_pattern = r'\[TASK:OPEN_APP\](.*?)\[/TASK\]'
-        matches = re.findall(open_app_pattern, ai_response)
-        for app_name in matches:
-            result = self.task_executor.open_application(app_name.strip())
-            results.append(result)
+        app_names = [app_name.strip() for app_name in tasks.get('OPEN_APP', ())]
+        if app_names:
+            results.extend(self.task_executor.open_applications(app_names))
         
         # 匹配系统信息任务
-        if '[TASK:SYSTEM_INFO][/TASK]' in ai_response:
+        if '' in tasks.get('SYSTEM_INFO', ()):
             result = self.task_executor.get_system_info()
             results.append(result)
         
         # 匹配列出目录任务
-        list_dir_pattern = r'\[TASK:LIST_DIR\](.*?)\[/TASK\]'
-        matches = re.findall(list_dir_pattern, ai_response)
-        for dir_path in matches:
+        for dir_path in tasks.get('LIST_DIR', ()):
             result = self.task_executor.list_directory(dir_path.strip())
             results.append(result)
             
         # 匹配系统电源操作任务
-        power_action_pattern = r'\[TASK:POWER_ACTION\](.*?)\[/TASK\]'
-        matches = re.findall(power_action_pattern, ai_response)
-        for action in matches:
+        for action in tasks.get('POWER_ACTION', ()):
             result = self.task_executor.system_power_action(action.strip())
             results.append(result)
         
-        # 匹配搜索应用任务
-        search_apps_pattern = r'\[TASK:SEARCH_APPS\](.*?)\[/TASK\]'
-        matches = re.findall(search_apps_pattern, ai_response)
-        for keyword in matches:
+        # 匹配搜索应用任务（无参数时列出全部应用）
+        for keyword in tasks.get('SEARCH_APPS', ()):
             result = self.task_executor.search_applications(keyword.strip())
             results.append(result)
         
-        # 匹配无参数的搜索应用任务
-        if '[TASK:SEARCH_APPS][/TASK]' in ai_response:
-            result = self.task_executor.search_applications()
-            results.append(result)
-        
         # 匹配列出桌面快捷方式任务
-        if '[TASK:LIST_SHORTCUTS][/TASK]' in ai_response:
+        if '' in tasks.get('LIST_SHORTCUTS', ()):
             result = self.task_executor.list_desktop_shortcuts()
             results.append(result)
         
         # 统一处理文件操作和写入文件任务
-        all_file_operations = []
-        
-        # 匹配文件操作任务
-        file_op_pattern = r'\[TASK:FILE_OP\](.*?)\[/TASK\]'
-        file_matches = re.findall(file_op_pattern, ai_response)
-        all_file_operations.extend(file_matches)
+        all_file_operations = list(tasks.get('FILE_OP', ()))
         
         # 匹配写入文件任务，转换为文件操作格式
-        write_file_pattern = r'\[TASK:WRITE_FILE\](.*?)\[/TASK\]'
-        write_matches = re.findall(write_file_pattern, ai_response, re.DOTALL)
-        for write_params in write_matches:
+        for write_params in tasks.get('WRITE_FILE', ()):
             parts = write_params.split('|', 1)  # 只分割第一个|，因为内容可能包含|
             if len(parts) >= 2:
                 file_path = parts[0].strip()
@@ -2582,36 +2375,68 @@ class AIDesktopAssistant:
             results.append(result)
         
         # 匹配清理系统任务
-        if '[TASK:CLEAN_SYSTEM][/TASK]' in ai_response:
+        if '' in tasks.get('CLEAN_SYSTEM', ()):
             result = self.task_executor.clean_system_junk()
             results.append(result)
         
         # 匹配系统控制任务
-        system_control_pattern = r'\[TASK:SYSTEM_CONTROL\](.*?)\[/TASK\]'
-        control_matches = re.findall(system_control_pattern, ai_response)
-        for control_params in control_matches:
+        for control_params in tasks.get('SYSTEM_CONTROL', ()):
             parts = control_params.split('|', 1)
             action = parts[0].strip()
             params = parts[1].strip() if len(parts) > 1 else ""
-            # 修复：调用正确的方法名
             result = TaskExecutor.system_control_action(action, params)
             results.append(result)
         
         return '\n'.join(results) if results else ""
     
+    def _reply_cache_key(self, user_input: str) -> tuple:
+        """回复缓存键：模型、系统提示词、当前对话历史和本轮输入都相同时才视为同一轮对话"""
+        history = tuple((msg["role"], msg["content"]) for msg in self.conversation_history)
+        return (self.current_model, self.system_prompt, history, user_input)
+    
+    def _get_cached_reply(self, key: tuple) -> Optional[str]:
+        """查找缓存的回复，命中时标记为最近使用"""
+        reply = self._reply_cache.get(key)
+        if reply is not None:
+            self._reply_cache.move_to_end(key)
+        return reply
+    
+    def _cache_reply(self, key: tuple, reply: str):
+        """缓存一轮成功的回复（请求失败的回复由调用方跳过），超出容量时淘汰最久未使用的"""
+        if not reply:
+            return
+        self._reply_cache[key] = reply
+        self._reply_cache.move_to_end(key)
+        if len(self._reply_cache) > _REPLY_CACHE_SIZE:
+            self._reply_cache.popitem(last=False)
+    
+    def _append_history(self, role: str, content: str):
+        """向对话历史追加一条消息并更新计数"""
+        self.conversation_history.append({"role": role, "content": content})
+        self._history_role_counts[role] += 1
+    
     def _trim_conversation_history(self):
-        """限制对话历史长度，保持最近的对话"""
+        """限制对话历史长度，保持最近的对话
+        
+        超出上限时一次性裁剪到上限的一半，而不是每轮只丢弃最早的一对：
+        这样接下来的若干轮里消息前缀保持不变，Ollama可以复用已缓存的KV，
+        不必每轮都重新预填充整段历史。
+        """
         if len(self.conversation_history) > self.max_history_length:
             # 保留最近的对话，但确保成对出现（用户-助手）
-            excess = len(self.conversation_history) - self.max_history_length
+            excess = len(self.conversation_history) - self.max_history_length // 2
             # 确保删除的是成对的对话
             if excess % 2 != 0:
                 excess += 1
-            self.conversation_history = self.conversation_history[excess:]
+            # 从左端逐条弹出，避免每轮复制整个列表
+            for _ in range(min(excess, len(self.conversation_history))):
+                removed = self.conversation_history.popleft()
+                self._history_role_counts[removed["role"]] -= 1
     
     def clear_conversation_history(self):
         """清空对话历史"""
-        self.conversation_history = []
+        self.conversation_history.clear()
+        self._history_role_counts = {"user": 0, "assistant": 0}
         return "✅ 对话历史已清空"
     
     def get_conversation_summary(self) -> str:
@@ -2619,15 +2444,49 @@ class AIDesktopAssistant:
         if not self.conversation_history:
             return "📝 当前没有对话历史"
         
-        user_count = sum(1 for msg in self.conversation_history if msg["role"] == "user")
-        assistant_count = sum(1 for msg in self.conversation_history if msg["role"] == "assistant")
+        user_count = self._history_role_counts["user"]
+        assistant_count = self._history_role_counts["assistant"]
         
         return f"📝 对话历史摘要:\n- 用户消息: {user_count} 条\n- 助手回复: {assistant_count} 条\n- 总计: {len(self.conversation_history)} 条消息"
 
+# 启动完成后显示的使用提示
+_READY_TIPS = (
+    "💡 提示: 你可以要求我打开应用程序、查看系统信息、文件操作等\n"
+    "💡 支持上下文关联对话，AI会记住之前的对话内容\n"
+    "💡 支持将AI生成的内容写入txt、md等文本文件\n"
+    "💡 输入 'clear' 清空对话历史，'history' 查看对话摘要\n"
+    "💡 输入 'quit' 或 'exit' 退出程序\n"
+    "⚡ 注意: 模型运行速度与电脑性能和模型大小有关\n"
+    + "=" * 50 + "\n"
+)
+
+# 对话中的特殊命令（小写） -> 命令类型
+_CHAT_COMMANDS = {
+    "quit": "quit", "exit": "quit", "退出": "quit", "再见": "quit",
+    "clear": "clear", "清空": "clear", "清空历史": "clear",
+    "history": "history", "历史": "history", "对话历史": "history",
+}
+
+def buffered_stream(chunks, max_chars: int = 512, max_interval: float = 0.025):
+    """把流式回复的小块合并后再输出：累计超过max_chars个字符或距上次输出超过max_interval秒时产出一次，结束时产出剩余部分"""
+    buffer = []
+    buffered_chars = 0
+    last_emit = float("-inf")  # 第一块立即输出，不拖慢首字显示
+    for chunk in chunks:
+        buffer.append(chunk)
+        buffered_chars += len(chunk)
+        now = time.monotonic()
+        if buffered_chars >= max_chars or now - last_emit >= max_interval:
+            yield "".join(buffer)
+            buffer = []
+            buffered_chars = 0
+            last_emit = now
+    if buffer:
+        yield "".join(buffer)
+
 def get_system_specs():
     """获取系统规格信息"""
     try:
-        import platform
         import psutil
         
         # CPU信息
@@ -2640,12 +2499,13 @@ def get_system_specs():
         memory_gb = memory.total / (1024**3)
         
         # 系统信息
+        system, _, processor, _ = _platform_info()
         system_info = {
             'cpu_cores': cpu_count,
             'cpu_freq_ghz': cpu_freq_ghz,
             'memory_gb': memory_gb,
-            'system': platform.system(),
-            'processor': platform.processor()
+            'system': system,
+            'processor': processor
         }
         
         return system_info
@@ -2799,148 +2659,119 @@ def main():
     print(f"✅ 已选择模型: {selected_model} ({mode_text})")
     print(f"📊 模型信息: 约{model_size:.1f}GB, 预估初始化时间: {estimated_init_time:.1f}秒")
     
-    # 初始化AI模型（预热）
+    # 初始化AI模型（预热）：在后台线程中进行，用户阅读提示、输入问题的同时模型已在加载
     mode_text = "快速" if quick_mode else "标准"
-    print(f"\n🔄 正在{mode_text}初始化AI模型，预计需要 {estimated_init_time:.1f} 秒...")
-    import time
-    import threading
-    start_time = time.time()
-    
-    # 动画效果相关变量
-    animation_running = True
-    animation_chars = ["⠋", "⠙", "⠹", "⠸", "⠼", "⠴", "⠦", "⠧", "⠇", "⠏"]
-    
-    if quick_mode:
-        animation_messages = [
-            "⚡ 快速启动中",
-            "🔧 简化配置加载",
-            "🎯 优化响应速度",
-            "✨ 准备智能助手"
-        ]
-    else:
-        animation_messages = [
-            "🧠 正在唤醒AI大脑",
-            "📚 正在加载知识库",
-            "🔧 正在配置系统功能",
-            "🎯 正在优化响应速度",
-            "✨ 正在准备智能助手"
-        ]
-    
-    def show_loading_animation():
-        """显示加载动画"""
-        char_index = 0
-        message_index = 0
-        message_counter = 0
-        
-        while animation_running:
-            # 每隔一定时间切换消息
-            if message_counter % 15 == 0:  # 每1.5秒切换一次消息
-                current_message = animation_messages[message_index % len(animation_messages)]
-                message_index += 1
-            
-            # 显示动画字符和消息
-            print(f"\r   {animation_chars[char_index]} {current_message}{'.' * (message_counter % 4)}", end="", flush=True)
-            
-            char_index = (char_index + 1) % len(animation_chars)
-            message_counter += 1
-            time.sleep(0.1)
-    
-    # 启动动画线程
-    animation_thread = threading.Thread(target=show_loading_animation, daemon=True)
-    animation_thread.start()
-    
-    try:
-        # 发送一个包含系统提示词的初始化消息来真正预热模型
-        init_message = "系统初始化测试，请简短回复确认你已准备好" if quick_mode else "系统初始化测试，请简短回复确认你已准备好协助用户"
-        init_response = assistant.ollama_client.chat(
-            model=selected_model,
-            messages=[{"role": "user", "content": init_message}],
-            system_prompt=assistant.system_prompt  # 使用对应模式的系统提示词
-        )
-        
-        # 停止动画
-        animation_running = False
-        time.sleep(0.2)  # 等待动画线程结束
-        print("\r" + " " * 60 + "\r", end="")  # 清除动画行
-        
-        end_time = time.time()
-        init_duration = end_time - start_time
-        
-        # 确保收到了回复
-        # 确保收到了回复
-        if init_response:
-            # 比较实际时间与预估时间 - 提高精度判断
-            time_diff = init_duration - estimated_init_time
-            if abs(time_diff) <= 1.5:
-                time_status = "✅ 预估准确"
-            elif time_diff > 1.5:
-                time_status = f"⏰ 比预估慢 {time_diff:.1f}秒"
-            else:
-                time_status = f"⚡ 比预估快 {abs(time_diff):.1f}秒"
-            
-            mode_text = "快速模式" if quick_mode else "标准模式"
-            print(f"✅ AI模型初始化完成！({mode_text}, 实际耗时: {init_duration:.1f}秒, {time_status})")
-            if len(init_response) > 100:
-                print(f"   模型回复: {init_response[:80]}...")
+    print(f"\n🔄 正在后台{mode_text}初始化AI模型，预计需要 {estimated_init_time:.1f} 秒，可以先输入问题...")
+    warmup_done = threading.Event()
+    warmup_state = {"waiting": False}  # 主线程是否正在等待预热完成（此时不在输入提示符处）
+    # 保护waiting标记与预热完成状态：两个线程都在持锁时读写，检查与更新之间不会被对方插入
+    warmup_lock = threading.Lock()
+    
+    # 终端中安装了prompt_toolkit时使用带历史记录的输入会话，否则退回input()
+    prompt_session = None
+    if PromptSession is not None and sys.stdin.isatty() and sys.stdout.isatty():
+        try:
+            prompt_session = PromptSession(history=FileHistory(_INPUT_HISTORY_FILE))
+        except Exception:
+            prompt_session = None
+    
+    def read_user_input() -> str:
+        """读取一行用户输入"""
+        if prompt_session is None:
+            return input("\n👤 你: ")
+        print()
+        # 等待输入期间其他线程的输出显示在提示符上方，不打乱正在编辑的行
+        with patch_stdout():
+            return prompt_session.prompt("👤 你: ")
+    
+    def warm_up_model():
+        """发送一个包含系统提示词的初始化消息来真正预热模型，完成后报告耗时"""
+        start_time = time.perf_counter()
+        try:
+            # 模型加载后会保持常驻，之后的真实对话与预热请求共享系统提示词前缀，可直接复用其KV缓存
+            # 预热直接调用客户端，不写入对话历史
+            init_message = "系统初始化测试，请简短回复确认你已准备好" if quick_mode else "系统初始化测试，请简短回复确认你已准备好协助用户"
+            init_response = assistant.ollama_client.chat(
+                model=selected_model,
+                messages=[{"role": "user", "content": init_message}],
+                system_prompt=assistant.system_prompt,  # 使用对应模式的系统提示词
+                options={"num_predict": _WARMUP_NUM_PREDICT},  # 只生成简短回复，不必等完整解码
+                retries=_WARMUP_RETRIES  # 服务刚启动时连接可能暂时失败，重试几次而不是直接放弃
+            )
+            init_duration = time.perf_counter() - start_time
+            
+            # 确保收到了回复
+            if init_response:
+                # 比较实际时间与预估时间 - 提高精度判断
+                time_diff = init_duration - estimated_init_time
+                if abs(time_diff) <= 1.5:
+                    time_status = "✅ 预估准确"
+                elif time_diff > 1.5:
+                    time_status = f"⏰ 比预估慢 {time_diff:.1f}秒"
+                else:
+                    time_status = f"⚡ 比预估快 {abs(time_diff):.1f}秒"
+                
+                report = [f"✅ AI模型初始化完成！({'快速模式' if quick_mode else '标准模式'}, 实际耗时: {init_duration:.1f}秒, {time_status})"]
+                suffix = "..." if len(init_response) > 80 else ""
+                report.append(f"   模型回复: {init_response[:80]}{suffix}")
             else:
-                print(f"   模型回复: {init_response}")
-        else:
-            print("⚠️ 模型初始化可能未完全成功，但仍可正常使用")
-            
-        # 清空初始化对话，避免影响后续对话
-        assistant.conversation_history = []
-            
-    except Exception as e:
-        # 停止动画
-        animation_running = False
-        time.sleep(0.2)  # 等待动画线程结束
-        print("\r" + " " * 60 + "\r", end="")  # 清除动画行
-        
-        end_time = time.time()
-        init_duration = end_time - start_time
-        print(f"⚠️ 模型初始化失败(耗时: {init_duration:.1f}秒)，但仍可正常使用: {e}")
-    
-    print("\n🎯 AI桌面助手已就绪！")
-    print("\n🎯 AI桌面助手已就绪！")
-    if quick_mode:
-        print("⚡ 快速模式: 启动速度优化，功能完整可用")
-    else:
-        print("🔧 标准模式: 完整功能，详细任务识别")
-    print("💡 提示: 你可以要求我打开应用程序、查看系统信息、文件操作等")
-    print("💡 支持上下文关联对话，AI会记住之前的对话内容")
-    print("💡 支持将AI生成的内容写入txt、md等文本文件")
-    print("💡 输入 'clear' 清空对话历史，'history' 查看对话摘要")
-    print("💡 输入 'quit' 或 'exit' 退出程序")
-    print("⚡ 注意: 模型运行速度与电脑性能和模型大小有关")
-    print("=" * 50)
+                report = ["⚠️ 模型初始化可能未完全成功，但仍可正常使用"]
+        except Exception as e:
+            init_duration = time.perf_counter() - start_time
+            report = [f"⚠️ 模型初始化失败(耗时: {init_duration:.1f}秒)，但仍可正常使用: {e}"]
+        
+        # 报告可能打印在等待输入的提示符之后，此时打印完重新显示提示符
+        with warmup_lock:
+            print("\n" + "\n".join(report))
+            if not warmup_state["waiting"] and prompt_session is None:
+                print("\n👤 你: ", end="", flush=True)
+            warmup_done.set()
+    
+    threading.Thread(target=warm_up_model, daemon=True).start()
+    
+    mode_line = "⚡ 快速模式: 启动速度优化，功能完整可用" if quick_mode else "🔧 标准模式: 完整功能，详细任务识别"
+    sys.stdout.write(f"\n🎯 AI桌面助手已就绪！\n{mode_line}\n{_READY_TIPS}")
+    sys.stdout.flush()
+    
+    # 流式输出直接写标准输出，省去print的参数处理
+    write_stdout = sys.stdout.write
+    flush_stdout = sys.stdout.flush
     
     # 主对话循环
     while True:
         try:
-            user_input = input("\n👤 你: ").strip()
-            
-            if user_input.lower() in ['quit', 'exit', '退出', '再见']:
-                print("👋 再见！")
-                break
+            user_input = read_user_input().strip()
             
             if not user_input:
                 continue
             
             # 处理特殊命令
-            if user_input.lower() in ['clear', '清空', '清空历史']:
+            command = _CHAT_COMMANDS.get(user_input.lower())
+            if command == "quit":
+                print("👋 再见！")
+                break
+            if command == "clear":
                 result = assistant.clear_conversation_history()
                 print(f"🤖 AI助手: {result}")
                 continue
-            
-            if user_input.lower() in ['history', '历史', '对话历史']:
+            if command == "history":
                 result = assistant.get_conversation_summary()
                 print(f"🤖 AI助手: {result}")
                 continue
             
+            # 预热尚未完成时先等待，避免同一模型被并发加载
+            with warmup_lock:
+                warmup_state["waiting"] = not warmup_done.is_set()
+            if warmup_state["waiting"]:
+                print("⏳ 模型仍在预热，请稍候...")
+                warmup_done.wait()
+                warmup_state["waiting"] = False
+            
             print("🤖 AI助手: ", end="", flush=True)
-            # 使用流式输出
-            for chunk in assistant.process_user_input_stream(user_input):
-                print(chunk, end="", flush=True)
+            # 使用流式输出（过于密集的小块已在process_user_input_stream中合并）
+            for text in assistant.process_user_input_stream(user_input):
+                write_stdout(text)
+                flush_stdout()
             print()  # 换行
             
         except KeyboardInterrupt:
@@ -2948,6 +2779,8 @@ def main():
             break
         except Exception as e:
             print(f"❌ 发生错误: {e}")
+    
+    assistant.ollama_client.close()
 
 if __name__ == "__main__":
     main()
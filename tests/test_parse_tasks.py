@@ -0,0 +1,48 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+AI回复中任务标记解析的回归测试
+"""
+
+import os
+import sys
+import unittest
+from unittest import mock
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from ai_desktop_assistant import AIDesktopAssistant
+
+
+def parse_tasks(ai_response: str) -> dict:
+    """解析回复中的任务标记，返回按类型分组的任务参数（不实际执行任务）"""
+    assistant = AIDesktopAssistant()
+    collected = {}
+    with mock.patch.object(assistant, '_execute_tasks', side_effect=collected.update):
+        assistant._parse_and_execute_tasks(ai_response)
+    assistant.ollama_client.close()
+    return collected
+
+
+class ParseTasksTest(unittest.TestCase):
+    """_parse_and_execute_tasks的任务标记解析"""
+
+    def test_unclosed_tag_does_not_swallow_later_task(self):
+        """缺少[/TASK]的单行任务标记不会吞掉下一行中的有效任务"""
+        tasks = parse_tasks("[TASK:OPEN_APP]记事本\n好的 [TASK:SYSTEM_INFO][/TASK]")
+        self.assertEqual(tasks, {'SYSTEM_INFO': ['']})
+
+    def test_unclosed_tag_before_write_file(self):
+        """缺少[/TASK]的文件操作标记之后的写入文件任务仍会执行"""
+        tasks = parse_tasks("[TASK:FILE_OP]删除|a\n[TASK:WRITE_FILE]~/a.txt|x[/TASK]")
+        self.assertEqual(tasks, {'WRITE_FILE': ['~/a.txt|x']})
+
+    def test_write_file_body_may_span_lines(self):
+        """写入文件任务的内容允许跨行，其他任务的参数不允许"""
+        tasks = parse_tasks("[TASK:WRITE_FILE]~/a.txt|第一行\n第二行[/TASK]\n"
+                            "[TASK:OPEN_APP]记事本\n[/TASK][TASK:OPEN_APP]微信[/TASK]")
+        self.assertEqual(tasks, {'WRITE_FILE': ['~/a.txt|第一行\n第二行'], 'OPEN_APP': ['微信']})
+
+
+if __name__ == '__main__':
+    unittest.main()